@@ -4,316 +4,492 @@ STRIDE-GPT GitHub Action Entry Point
 """
 
 import os
+import re
 import sys
 import json
 import asyncio
-from typing import Optional
+import traceback
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-from src.github_client import GitHubClient
-from src.stride_client import StrideClient
-from src.analyzer import ActionAnalyzer
-from src.reporter import CommentReporter
+try:
+    import orjson
 
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
-async def main():
+if TYPE_CHECKING:
+    from src.analyzer import ActionAnalyzer, AnalysisResult
+    from src.github_client import GitHubClient
+    from src.reporter import CommentReporter
+    from src.stride_client import StrideClient
+
+# Matches "@stride-gpt <command>"; case is handled by the regex engine
+_CMD_RE = re.compile(r"@stride-gpt\s+(\w+)", re.IGNORECASE)
+_MENTION = "@stride-gpt"
+
+
+async def main(github_context: Optional[Dict[str, Any]] = None):
     """Main entry point for the GitHub Action."""
 
-    # Get environment variables
-    api_key = os.environ.get("STRIDE_API_KEY")
-    github_token = os.environ.get("GITHUB_TOKEN")
-    trigger_mode = os.environ.get("TRIGGER_MODE", "comment")
+    # Read all environment configuration once up front
+    env = os.environ
+    api_key = env.get("STRIDE_API_KEY")
+    github_token = env.get("GITHUB_TOKEN")
+    trigger_mode = env.get("TRIGGER_MODE", "comment")
+    repo_name = env.get("GITHUB_REPOSITORY")
 
     # Validate required inputs
     if not api_key:
-        print(
-            "::error::STRIDE_API_KEY is required. Get your free key at https://stridegpt.ai"
-        )
+        _error("STRIDE_API_KEY is required. Get your free key at https://stridegpt.ai")
         sys.exit(1)
 
     if not github_token:
-        print("::error::GITHUB_TOKEN is required")
+        _error("GITHUB_TOKEN is required")
+        sys.exit(1)
+
+    try:
+        # A limit below one would block every request, so clamp it
+        concurrency = max(1, int(env.get("STRIDE_GH_CONCURRENCY", "10")))
+    except ValueError:
+        _error("STRIDE_GH_CONCURRENCY must be an integer")
         sys.exit(1)
 
     # Get GitHub context
-    github_context = json.loads(os.environ.get("GITHUB_CONTEXT", "{}"))
-    repo_name = os.environ.get("GITHUB_REPOSITORY")
+    if github_context is None:
+        github_context = load_github_context()
+    # Keep only the webhook fields we use so the parsed payload can be freed
+    event = extract_event_fields(github_context)
+    del github_context
 
     if not repo_name:
-        print("::error::GITHUB_REPOSITORY not found in environment")
+        _error("GITHUB_REPOSITORY not found in environment")
+        sys.exit(1)
+
+    # Resolve the handler before any client is set up
+    handler = TRIGGER_HANDLERS.get(trigger_mode)
+    if handler is None:
+        _error(f"Unknown trigger mode: {trigger_mode}")
         sys.exit(1)
 
+    # Bail out on unrelated comments before setting up any clients
+    if trigger_mode == "comment":
+        if event["event_name"] != "issue_comment":
+            _error("Comment trigger requires issue_comment event")
+            sys.exit(1)
+
+        if _MENTION not in event["comment_body"]:
+            print("Comment does not mention @stride-gpt, skipping")
+            sys.exit(0)
+
     try:
-        # Initialize clients
-        github_client = GitHubClient(github_token, repo_name)
-        stride_client = StrideClient(api_key)
-        analyzer = ActionAnalyzer(github_client, stride_client)
-        reporter = CommentReporter(github_client, stride_client)
-
-        # Handle different trigger modes
-        if trigger_mode == "comment":
-            # Handle comment trigger
-            if github_context.get("event_name") != "issue_comment":
-                print("::error::Comment trigger requires issue_comment event")
-                sys.exit(1)
-
-            comment_body = (
-                github_context.get("event", {}).get("comment", {}).get("body", "")
+        # Import lazily so skipped runs never load the HTTP/GitHub stack
+        from src.github_client import GitHubClient
+        from src.stride_client import HTTP2_AVAILABLE, StrideClient
+        from src.analyzer import ActionAnalyzer
+        from src.reporter import CommentReporter
+        import httpx
+
+        # Bound concurrent outbound API calls to avoid secondary rate limits
+        limiter = asyncio.Semaphore(concurrency)
+
+        # One pooled HTTP client shared by every GitHub and STRIDE API call
+        async with httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=20, keepalive_expiry=60.0),
+        ) as http_client:
+            # Initialize clients
+            github_client = GitHubClient(
+                github_token, repo_name, http_client=http_client, limiter=limiter
             )
-            issue_number = (
-                github_context.get("event", {}).get("issue", {}).get("number")
+            stride_client = StrideClient(
+                api_key, http_client=http_client, limiter=limiter
             )
+            analyzer = ActionAnalyzer(github_client, stride_client)
+            reporter = CommentReporter(github_client, stride_client)
 
-            if not issue_number:
-                print("::error::Could not determine issue/PR number")
-                sys.exit(1)
+            await handler(event, github_client, stride_client, analyzer, reporter)
 
-            # Check if comment mentions @stride-gpt
-            if "@stride-gpt" not in comment_body:
-                print("Comment does not mention @stride-gpt, skipping")
-                sys.exit(0)
+            _notice("Analysis completed successfully")
+            sys.stdout.flush()
 
-            # Determine if this is a PR comment or issue comment
-            is_pull_request = (
-                github_context.get("event", {}).get("issue", {}).get("pull_request")
-                is not None
-            )
+    except Exception as e:
+        # One annotation for the UI, with the traceback folded into a group
+        _error(f"Action failed: {type(e).__name__}: {e}", title="STRIDE-GPT failure")
+        sys.stdout.write(
+            f"::group::Traceback\n{traceback.format_exc()}\n::endgroup::\n"
+        )
+        sys.exit(1)
 
-            # Parse command
-            command = parse_command(comment_body)
-
-            if command == "help":
-                await reporter.post_help_comment(issue_number, is_pull_request)
-            elif command == "status":
-                usage = await stride_client.get_usage()
-                await reporter.post_status_comment(issue_number, usage, is_pull_request)
-            elif command == "analyze":
-                if is_pull_request:
-                    # Run PR analysis
-                    print(f"::notice::Starting threat analysis for PR #{issue_number}")
-                    result = await analyzer.analyze_pr(issue_number)
-                else:
-                    # Run feature description analysis
-                    print(
-                        f"::notice::Starting threat modeling for feature described in issue #{issue_number}"
-                    )
-                    result = await analyzer.analyze_feature_description(issue_number)
-
-                # Post results
-                comment_url = await reporter.post_analysis_comment(
-                    issue_number, result, is_pull_request
-                )
-
-                # Set outputs
-                try:
-                    output_file = os.environ.get("GITHUB_OUTPUT", "/dev/stdout")
-                    if output_file != "/dev/stdout":
-                        with open(output_file, "a") as f:
-                            f.write(f"threat-count={result.threat_count}\n")
-                            f.write(f"report-url={comment_url}\n")
-                    else:
-                        print(f"::set-output name=threat-count::{result.threat_count}")
-                        print(f"::set-output name=report-url::{comment_url}")
-                except PermissionError:
-                    # Fallback for systems where we can't write to the output file
-                    print(f"::set-output name=threat-count::{result.threat_count}")
-                    print(f"::set-output name=report-url::{comment_url}")
-            else:
-                await reporter.post_error_comment(
-                    issue_number,
-                    f"Unknown command: {command}. Use '@stride-gpt help' for available commands.",
-                    is_pull_request,
-                )
-
-        elif trigger_mode == "pr":
-            # Handle PR trigger
-            pr_number = (
-                github_context.get("event", {}).get("pull_request", {}).get("number")
-            )
 
-            if not pr_number:
-                print("::error::Could not determine PR number from context")
-                sys.exit(1)
-
-            # Run analysis
-            print(f"::notice::Starting automatic security analysis for PR #{pr_number}")
-            result = await analyzer.analyze_pr(pr_number)
-
-            # Post results
-            comment_url = await reporter.post_analysis_comment(pr_number, result)
-
-            # Set outputs
-            try:
-                output_file = os.environ.get("GITHUB_OUTPUT", "/dev/stdout")
-                if output_file != "/dev/stdout":
-                    with open(output_file, "a") as f:
-                        f.write(f"threat-count={result.threat_count}\n")
-                        f.write(f"report-url={comment_url}\n")
-                else:
-                    print(f"::set-output name=threat-count::{result.threat_count}")
-                    print(f"::set-output name=report-url::{comment_url}")
-            except PermissionError:
-                # Fallback to legacy output format
-                print(f"::set-output name=threat-count::{result.threat_count}")
-                print(f"::set-output name=report-url::{comment_url}")
-
-        elif trigger_mode == "manual":
-            # Handle manual trigger - analyze the entire repository
-            print(
-                f"::notice::Starting manual security analysis for repository {repo_name}"
-            )
-            print("::notice::This may take up to 3 minutes for large repositories...")
-            result = await analyzer.analyze_repository()
-
-            # For manual triggers, we'll output to the logs instead of PR comments
-            print("::group::STRIDE-GPT Security Analysis Results")
-            print(f"Repository: {repo_name}")
-            print(f"Analysis ID: {result.analysis_id}")
-            print(f"Threats found: {result.threat_count}")
-
-            # Show analysis metadata for transparency
-            if hasattr(result, "usage_info") and result.usage_info:
-                metadata = result.usage_info
-                if "model_used" in metadata:
-                    print(f"Model used: {metadata['model_used']}")
-                if "analysis_time_ms" in metadata:
-                    print(f"Analysis time: {metadata['analysis_time_ms']}ms")
-                if "plan" in metadata:
-                    print(f"Plan tier: {metadata['plan']}")
-
-                # Show token usage and cost if available
-                if "token_usage" in metadata and metadata["token_usage"]:
-                    usage = metadata["token_usage"]
-                    print(
-                        f"Token usage: {usage.get('input_tokens', 0)} input → {usage.get('output_tokens', 0)} output"
-                    )
-                    if usage.get("reasoning_tokens", 0) > 0:
-                        print(f"Reasoning tokens: {usage['reasoning_tokens']}")
-                    print(
-                        f"Total tokens: {usage.get('total_tokens', usage.get('input_tokens', 0) + usage.get('output_tokens', 0))}"
-                    )
-
-                if "cost_info" in metadata and metadata["cost_info"]:
-                    cost = metadata["cost_info"]
-                    print(f"API cost: {cost.get('total_cost_usd', 'N/A')}")
-                    if "breakdown" in cost:
-                        breakdown = cost["breakdown"]
-                        print(f"  - Input: {breakdown.get('input_cost', 'N/A')}")
-                        print(f"  - Output: {breakdown.get('output_cost', 'N/A')}")
-                        if "reasoning_cost" in breakdown:
-                            print(f"  - Reasoning: {breakdown['reasoning_cost']}")
-                        if "cached_input_cost" in breakdown:
-                            print(f"  - Cached input: {breakdown['cached_input_cost']}")
-
-                # Show input prompt if available (useful for debugging)
-                if "input_prompt" in metadata and metadata["input_prompt"]:
-                    print("\n::group::LLM Input Prompt (for debugging)")
-                    print(metadata["input_prompt"])
-                    print("::endgroup::")
-
-            if hasattr(result, "threats") and result.threats:
-                for i, threat in enumerate(result.threats, 1):
-                    print(f"\n--- Threat {i} ---")
-                    # Handle threat as dictionary (API response format)
-                    if isinstance(threat, dict):
-                        print(f"Category: {threat.get('category', 'Unknown')}")
-                        print(f"Title: {threat.get('title', 'Unknown')}")
-                        print(f"Severity: {threat.get('severity', 'Unknown')}")
-                        print(
-                            f"Description: {threat.get('description', 'No description')}"
-                        )
-
-                        # Show DREAD score if available
-                        if threat.get("dread_score"):
-                            print(f"DREAD Score: {threat.get('dread_score')}/10")
-
-                        # Show affected components if available
-                        if threat.get("affected_files"):
-                            components = threat.get("affected_files", [])
-                            if components:
-                                print(
-                                    f"Affected components: {', '.join(components[:3])}"
-                                )
-                    else:
-                        # Handle threat as object (fallback)
-                        print(f"Category: {getattr(threat, 'category', 'Unknown')}")
-                        print(f"Title: {getattr(threat, 'title', 'Unknown')}")
-                        print(f"Severity: {getattr(threat, 'severity', 'Unknown')}")
-                        print(
-                            f"Description: {getattr(threat, 'description', 'No description')}"
-                        )
-
-                        # Show DREAD score if available
-                        if hasattr(threat, "dread_score") and threat.dread_score:
-                            print(f"DREAD Score: {threat.dread_score}/10")
-
-                        # Show affected components if available
-                        if hasattr(threat, "affected_files") and threat.affected_files:
-                            components = threat.affected_files[:3]
-                            if components:
-                                print(f"Affected components: {', '.join(components)}")
-
-            # Show limitation notice if present
-            if result.limitation_notice:
-                print(f"\nNote: {result.limitation_notice}")
-
-            print("::endgroup::")
-
-            # Set outputs
-            try:
-                output_file = os.environ.get("GITHUB_OUTPUT", "/dev/stdout")
-                if output_file != "/dev/stdout":
-                    with open(output_file, "a") as f:
-                        f.write(f"threat-count={result.threat_count}\n")
-                else:
-                    print(f"::set-output name=threat-count::{result.threat_count}")
-            except PermissionError:
-                # Fallback to legacy output format
-                print(f"::set-output name=threat-count::{result.threat_count}")
+async def _handle_comment(
+    event: Dict[str, Any],
+    github_client: "GitHubClient",
+    stride_client: "StrideClient",
+    analyzer: "ActionAnalyzer",
+    reporter: "CommentReporter",
+) -> None:
+    """Handle an @stride-gpt command in an issue or PR comment."""
+    issue_number = event["issue_number"]
+
+    if not issue_number:
+        _error("Could not determine issue/PR number")
+        sys.exit(1)
 
+    # Determine if this is a PR comment or issue comment
+    is_pull_request = event["is_pull_request"]
+
+    # Parse command
+    command = parse_command(event["comment_body"])
+
+    if command == "help":
+        await reporter.post_help_comment(issue_number)
+    elif command == "status":
+        usage = await stride_client.get_usage()
+        await reporter.post_status_comment(issue_number, usage)
+    elif command == "analyze":
+        if is_pull_request:
+            # Run PR analysis
+            _notice(f"Starting threat analysis for PR #{issue_number}")
+            result = await analyzer.analyze_pr(issue_number)
         else:
-            print(f"::error::Unknown trigger mode: {trigger_mode}")
-            sys.exit(1)
+            # Run feature description analysis
+            _notice(
+                f"Starting threat modeling for feature described in issue #{issue_number}"
+            )
+            result = await analyzer.analyze_feature_description(issue_number)
 
-        print("::notice::Analysis completed successfully")
+        await post_results(reporter, issue_number, result)
+    else:
+        await reporter.post_error_comment(
+            issue_number,
+            f"Unknown command: {command}. Use '@stride-gpt help' for available commands.",
+        )
 
-    except Exception as e:
-        print(f"::error::Action failed: {str(e)}")
+
+async def _handle_pr(
+    event: Dict[str, Any],
+    github_client: "GitHubClient",
+    stride_client: "StrideClient",
+    analyzer: "ActionAnalyzer",
+    reporter: "CommentReporter",
+) -> None:
+    """Handle an automatic pull request trigger."""
+    pr_number = event["pr_number"]
+
+    if not pr_number:
+        _error("Could not determine PR number from context")
         sys.exit(1)
 
+    # Run analysis
+    _notice(f"Starting automatic security analysis for PR #{pr_number}")
+    result = await analyzer.analyze_pr(pr_number)
+    await post_results(reporter, pr_number, result)
+
+
+async def _handle_manual(
+    event: Dict[str, Any],
+    github_client: "GitHubClient",
+    stride_client: "StrideClient",
+    analyzer: "ActionAnalyzer",
+    reporter: "CommentReporter",
+) -> None:
+    """Handle a manual trigger by analyzing the entire repository."""
+    repo_name = github_client.repo_name
+    _notice(f"Starting manual security analysis for repository {repo_name}")
+    _notice("This may take up to 3 minutes for large repositories...")
+    result = await analyzer.analyze_repository()
+    report_manual_results(repo_name, result)
+
+
+# Trigger mode -> handler coroutine
+TRIGGER_HANDLERS = {
+    "comment": _handle_comment,
+    "pr": _handle_pr,
+    "manual": _handle_manual,
+}
+
+
+async def post_results(
+    reporter: "CommentReporter",
+    issue_number: int,
+    result: "AnalysisResult",
+) -> None:
+    """Post analysis results as a comment and set the action outputs."""
+    comment_url = await reporter.post_analysis_comment(issue_number, result)
+    set_outputs({"threat-count": result.threat_count, "report-url": comment_url})
+
+
+def report_manual_results(repo_name: str, result: "AnalysisResult") -> None:
+    """Report manual-mode results and set the action outputs."""
+    # For manual triggers, we'll output to the job summary (or the logs
+    # when it is unavailable) instead of PR comments
+    summary_file = os.environ.get("GITHUB_STEP_SUMMARY")
+    if summary_file:
+        try:
+            with open(summary_file, "a", encoding="utf-8") as f:
+                f.write(format_manual_summary(repo_name, result))
+            _notice(
+                f"Found {result.threat_count} threats, see the job summary for details"
+            )
+        except OSError:
+            # e.g. the container user cannot write the runner's file; the
+            # analysis has already been paid for, so keep the results
+            summary_file = None
+
+    if not summary_file:
+        sys.stdout.write(format_manual_report(repo_name, result))
+        sys.stdout.flush()
+
+    set_outputs({"threat-count": result.threat_count})
+
+
+def format_manual_report(repo_name: str, result: "AnalysisResult") -> str:
+    """Format manual-mode analysis results as a single log block."""
+    lines = [
+        "::group::STRIDE-GPT Security Analysis Results",
+        f"Repository: {repo_name}",
+        f"Analysis ID: {result.analysis_id}",
+        f"Threats found: {result.threat_count}",
+    ]
+
+    # Show analysis metadata for transparency
+    metadata = result.usage_info or {}
+    if metadata:
+        if "model_used" in metadata:
+            lines.append(f"Model used: {metadata['model_used']}")
+        if "analysis_time_ms" in metadata:
+            lines.append(f"Analysis time: {metadata['analysis_time_ms']}ms")
+        if "plan" in metadata:
+            lines.append(f"Plan tier: {metadata['plan']}")
+
+        # Show token usage and cost if available
+        if "token_usage" in metadata and metadata["token_usage"]:
+            usage = metadata["token_usage"]
+            lines.append(
+                f"Token usage: {usage.get('input_tokens', 0)} input → {usage.get('output_tokens', 0)} output"
+            )
+            if usage.get("reasoning_tokens", 0) > 0:
+                lines.append(f"Reasoning tokens: {usage['reasoning_tokens']}")
+            lines.append(
+                f"Total tokens: {usage.get('total_tokens', usage.get('input_tokens', 0) + usage.get('output_tokens', 0))}"
+            )
+
+        if "cost_info" in metadata and metadata["cost_info"]:
+            cost = metadata["cost_info"]
+            lines.append(f"API cost: {cost.get('total_cost_usd', 'N/A')}")
+            if "breakdown" in cost:
+                breakdown = cost["breakdown"]
+                lines.append(f"  - Input: {breakdown.get('input_cost', 'N/A')}")
+                lines.append(f"  - Output: {breakdown.get('output_cost', 'N/A')}")
+                if "reasoning_cost" in breakdown:
+                    lines.append(f"  - Reasoning: {breakdown['reasoning_cost']}")
+                if "cached_input_cost" in breakdown:
+                    lines.append(f"  - Cached input: {breakdown['cached_input_cost']}")
+
+        # Show input prompt if available (useful for debugging)
+        if "input_prompt" in metadata and metadata["input_prompt"]:
+            lines.append("\n::group::LLM Input Prompt (for debugging)")
+            lines.append(metadata["input_prompt"])
+            lines.append("::endgroup::")
+
+    for i, threat in enumerate(result.threats or [], 1):
+        lines.append(f"\n--- Threat {i} ---")
+        threat = _threat_as_dict(threat)
+        lines.append(f"Category: {threat.get('category', 'Unknown')}")
+        lines.append(f"Title: {threat.get('title', 'Unknown')}")
+        lines.append(f"Severity: {threat.get('severity', 'Unknown')}")
+        lines.append(f"Description: {threat.get('description', 'No description')}")
+
+        # Show DREAD score if available
+        if threat.get("dread_score"):
+            lines.append(f"DREAD Score: {threat['dread_score']}/10")
+
+        # Show affected components if available
+        components = threat.get("affected_files") or []
+        if components:
+            lines.append(f"Affected components: {', '.join(components[:3])}")
+
+    # Show limitation notice if present
+    if result.limitation_notice:
+        lines.append(f"\nNote: {result.limitation_notice}")
+
+    lines.append("::endgroup::")
+
+    return "\n".join(lines) + "\n"
+
+
+def format_manual_summary(repo_name: str, result: "AnalysisResult") -> str:
+    """Format manual-mode analysis results as Markdown for the job summary."""
+    lines = [
+        "## 🛡️ STRIDE GPT Security Analysis Results",
+        "",
+        f"- **Repository**: {repo_name}",
+        f"- **Analysis ID**: {result.analysis_id}",
+        f"- **Threats Found**: {result.threat_count}",
+    ]
+
+    # Show analysis metadata for transparency
+    metadata = result.usage_info or {}
+    if "model_used" in metadata:
+        lines.append(f"- **Model Used**: {metadata['model_used']}")
+    if "analysis_time_ms" in metadata:
+        lines.append(f"- **Analysis Time**: {metadata['analysis_time_ms']}ms")
+    if "plan" in metadata:
+        lines.append(f"- **Plan Tier**: {metadata['plan']}")
+    if metadata.get("cost_info"):
+        lines.append(
+            f"- **API Cost**: {metadata['cost_info'].get('total_cost_usd', 'N/A')}"
+        )
+
+    for i, threat in enumerate(result.threats or [], 1):
+        threat = _threat_as_dict(threat)
+        lines.extend(
+            [
+                "",
+                f"### Threat {i}: {threat.get('title', 'Unknown')}",
+                f"- **Category**: {threat.get('category', 'Unknown')}",
+                f"- **Severity**: {threat.get('severity', 'Unknown')}",
+            ]
+        )
+
+        # Show DREAD score if available
+        if threat.get("dread_score"):
+            lines.append(f"- **DREAD Score**: {threat['dread_score']}/10")
+
+        # Show affected components if available
+        components = threat.get("affected_files") or []
+        if components:
+            lines.append(f"- **Affected Components**: {', '.join(components[:3])}")
+
+        lines.extend(["", threat.get("description", "No description")])
+
+    # Show limitation notice if present
+    if result.limitation_notice:
+        lines.extend(["", f"> **Note**: {result.limitation_notice}"])
+
+    # The full-repository input prompt is left out: it can push the summary
+    # past GitHub's 1 MiB limit, and the summary is then dropped entirely
+    return "\n".join(lines) + "\n"
+
+
+def _threat_as_dict(threat: Any) -> Dict[str, Any]:
+    """Normalize a threat to the API's dict format."""
+    if isinstance(threat, dict):
+        return threat
+    # Fallback for threat objects
+    return {
+        "category": getattr(threat, "category", "Unknown"),
+        "title": getattr(threat, "title", "Unknown"),
+        "severity": getattr(threat, "severity", "Unknown"),
+        "description": getattr(threat, "description", "No description"),
+        "dread_score": getattr(threat, "dread_score", None),
+        "affected_files": getattr(threat, "affected_files", None),
+    }
+
+
+def _escape_data(value: str) -> str:
+    """Escape a workflow command message so newlines cannot end it early."""
+    return value.replace("%", "%25").replace("\r", "%0D").replace("\n", "%0A")
+
+
+def _escape_property(value: str) -> str:
+    """Escape a workflow command property value such as ``title``."""
+    return _escape_data(value).replace(":", "%3A").replace(",", "%2C")
+
+
+def _notice(message: str) -> None:
+    """Emit a notice annotation to the workflow log."""
+    sys.stdout.write(f"::notice::{_escape_data(message)}\n")
+
+
+def _error(message: str, title: Optional[str] = None) -> None:
+    """Emit an error annotation to the workflow log."""
+    params = f" title={_escape_property(title)}" if title else ""
+    sys.stdout.write(f"::error{params}::{_escape_data(message)}\n")
+
+
+def set_outputs(outputs: Dict[str, Any]) -> None:
+    """Set action outputs, writing them to GITHUB_OUTPUT in a single write."""
+    output_file = os.environ.get("GITHUB_OUTPUT", "/dev/stdout")
+    if output_file != "/dev/stdout":
+        try:
+            with open(output_file, "a") as f:
+                f.write("".join(f"{name}={value}\n" for name, value in outputs.items()))
+            return
+        except OSError:
+            # Fallback to legacy output format
+            pass
+
+    print(
+        "\n".join(
+            f"::set-output name={name}::{value}" for name, value in outputs.items()
+        )
+    )
+
 
 def parse_command(comment_body: str) -> Optional[str]:
     """Parse command from comment body."""
     # Simple command parsing - look for @stride-gpt followed by command
-    import re
-
-    match = re.search(r"@stride-gpt\s+(\w+)", comment_body.lower())
+    match = _CMD_RE.search(comment_body)
     if match:
-        return match.group(1)
+        return match.group(1).lower()
 
     # Default to analyze if just @stride-gpt is mentioned
-    if "@stride-gpt" in comment_body:
+    if _MENTION in comment_body:
         return "analyze"
 
     return None
 
 
+def extract_event_fields(github_context: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick out the webhook fields the trigger handlers use."""
+    event = github_context.get("event") or {}
+    comment = event.get("comment") or {}
+    issue = event.get("issue") or {}
+    pull_request = event.get("pull_request") or {}
+    return {
+        "event_name": github_context.get("event_name"),
+        "comment_body": comment.get("body") or "",
+        "issue_number": issue.get("number"),
+        "is_pull_request": issue.get("pull_request") is not None,
+        "pr_number": pull_request.get("number"),
+    }
+
+
+def load_github_context() -> Dict[str, Any]:
+    """Load the GitHub context from the environment."""
+    event_path = os.environ.get("GITHUB_EVENT_PATH")
+    has_event_file = bool(event_path) and os.path.exists(event_path)
+
+    # An explicit GITHUB_CONTEXT (e.g. from an external runner) is only used
+    # when the runner's event file is unavailable, as it can be very large
+    if not has_event_file and "GITHUB_CONTEXT" in os.environ:
+        return _json_loads(os.environ["GITHUB_CONTEXT"] or "{}")
+
+    # Otherwise build it from GitHub Actions environment variables
+    context = {
+        "event_name": os.environ.get("GITHUB_EVENT_NAME", ""),
+        "repository": os.environ.get("GITHUB_REPOSITORY", ""),
+        "event": {},
+    }
+
+    # Read event data straight from the event file
+    if has_event_file:
+        with open(event_path, "rb") as f:
+            context["event"] = _json_loads(f.read())
+
+    return context
+
+
 if __name__ == "__main__":
-    # Load GitHub context from environment
-    if "GITHUB_CONTEXT" not in os.environ:
-        # Try to load from GitHub Actions environment variables
-        context = {
-            "event_name": os.environ.get("GITHUB_EVENT_NAME", ""),
-            "repository": os.environ.get("GITHUB_REPOSITORY", ""),
-            "event": {},
-        }
-
-        # Try to load event data from event path
-        event_path = os.environ.get("GITHUB_EVENT_PATH")
-        if event_path and os.path.exists(event_path):
-            with open(event_path, "r") as f:
-                context["event"] = json.load(f)
-
-        os.environ["GITHUB_CONTEXT"] = json.dumps(context)
+    # Prefer uvloop's faster event loop where it is installed
+    try:
+        import uvloop
+
+        run = uvloop.run
+    except ImportError:
+        run = asyncio.run
 
     # Run the action
-    asyncio.run(main())
+    run(main(load_github_context()))
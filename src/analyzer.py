@@ -2,14 +2,19 @@
 Action Analyzer - Coordinates analysis between GitHub and STRIDE API
 """
 
+import sys
+import asyncio
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 
 from .github_client import GitHubClient
 from .stride_client import StrideClient, PaymentRequiredError, ForbiddenError
 
+# Slotted dataclasses drop the per-instance __dict__ (Python 3.10+ only)
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_DATACLASS_OPTIONS)
 class AnalysisResult:
     """Result from STRIDE analysis."""
 
@@ -28,177 +33,95 @@ class ActionAnalyzer:
     def __init__(self, github_client: GitHubClient, stride_client: StrideClient):
         self.github = github_client
         self.stride = stride_client
+        self._repo_url: Optional[str] = None
 
     async def analyze_pr(self, pr_number: int) -> AnalysisResult:
         """Analyze a pull request for security threats."""
 
-        # Get PR information
-        files = self.github.get_pr_files(pr_number)
+        # The API fetches the diff itself; we only need to know there is one
+        has_files, is_public = await asyncio.gather(
+            self.github.has_pr_files(pr_number), self.github.is_public_repo()
+        )
 
-        if not files:
-            return AnalysisResult(
-                threat_count=0,
-                threats=[],
-                analysis_id="",
-                usage_info={},
-                is_limited=False,
-                limitation_notice=None,
-            )
+        if not has_files:
+            return self._empty_result()
 
         # Prepare analysis request matching API model
-        # Convert repo name to full GitHub URL if needed
-        repository_url = self.github.repo_name
-        if not repository_url.startswith("https://"):
-            repository_url = f"https://github.com/{repository_url}"
-
-        analysis_request = {
-            "repository": repository_url,
-            "github_token": self.github.token,  # Pass token for API access
+        analysis_request = self._base_request() | {
             "pr_number": pr_number,
             "analysis_type": "changed_files",  # Explicitly request PR-specific analysis
-            "is_private": not self.github.is_public_repo(),  # Let API know repo visibility
+            "is_private": not is_public,  # Let API know repo visibility
         }
 
-        try:
-            # Submit to STRIDE API
-            result = await self.stride.analyze(analysis_request)
-
-            # Process results using new API response format
-            threats = result.get("threats", [])
-            summary = result.get("summary", {})
-
-            # Check if results were truncated by the API
-            is_limited = result.get("truncated", False)
-            upgrade_message = result.get("upgrade_message")
-            limitation_notice = result.get("limitation_notice")
-
-            return AnalysisResult(
-                threat_count=summary.get("total", len(threats)),
-                threats=threats,
-                analysis_id=result.get("analysis_id", ""),
-                usage_info=result.get("metadata", {}),
-                is_limited=is_limited,
-                upgrade_message=upgrade_message,
-                limitation_notice=limitation_notice,
-            )
-
-        except PaymentRequiredError:
-            # Return a special result indicating limit reached
-            return AnalysisResult(
-                threat_count=0,
-                threats=[],
-                analysis_id="",
-                usage_info={"limit_reached": True},
-                is_limited=True,
-                upgrade_message="Monthly analysis limit reached. Upgrade to continue analyzing.",
-                limitation_notice=None,
-            )
+        return await self._submit(analysis_request)
 
     async def analyze_feature_description(self, issue_number: int) -> AnalysisResult:
         """Analyze a proposed feature description for security threats."""
 
-        # Get issue description
-        feature_description = self.github.get_issue_description(issue_number)
+        # Get issue description and repo visibility concurrently
+        feature_description, is_public = await asyncio.gather(
+            self.github.get_issue_description(issue_number),
+            self.github.is_public_repo(),
+        )
 
         if not feature_description.strip():
-            return AnalysisResult(
-                threat_count=0,
-                threats=[],
-                analysis_id="",
-                usage_info={},
-                is_limited=False,
-                limitation_notice=None,
-            )
+            return self._empty_result()
 
         # Prepare analysis request for feature description
-        repository_url = self.github.repo_name
-        if not repository_url.startswith("https://"):
-            repository_url = f"https://github.com/{repository_url}"
-
-        analysis_request = {
-            "repository": repository_url,
-            "github_token": self.github.token,
+        analysis_request = self._base_request() | {
             "analysis_type": "feature_description",
-            "is_private": not self.github.is_public_repo(),  # Let API know repo visibility
+            "is_private": not is_public,  # Let API know repo visibility
             "options": {
                 "feature_description": feature_description,
                 "issue_number": issue_number,
             },
         }
 
-        try:
-            # Send to STRIDE API for conceptual threat modeling
-            result = await self.stride.analyze(analysis_request)
-
-            # Process results using new API response format
-            threats = result.get("threats", [])
-            summary = result.get("summary", {})
-
-            # Check if results were truncated by the API
-            is_limited = result.get("truncated", False)
-            upgrade_message = result.get("upgrade_message")
-            limitation_notice = result.get("limitation_notice")
-
-            return AnalysisResult(
-                threat_count=summary.get("total", len(threats)),
-                threats=threats,
-                analysis_id=result.get("analysis_id", ""),
-                usage_info=result.get("metadata", {}),
-                is_limited=is_limited,
-                upgrade_message=upgrade_message,
-                limitation_notice=limitation_notice,
-            )
-
-        except PaymentRequiredError:
-            # Return a special result indicating limit reached
-            return AnalysisResult(
-                threat_count=0,
-                threats=[],
-                analysis_id="",
-                usage_info={"limit_reached": True},
-                is_limited=True,
-                upgrade_message="Monthly analysis limit reached. Upgrade to continue analyzing.",
-                limitation_notice=None,
-            )
+        # Send to STRIDE API for conceptual threat modeling
+        return await self._submit(analysis_request)
 
     async def analyze_repository(self) -> AnalysisResult:
         """Analyze the entire repository for security threats."""
 
         # Prepare analysis request for full repository
-        repository_url = self.github.repo_name
-        if not repository_url.startswith("https://"):
-            repository_url = f"https://github.com/{repository_url}"
+        analysis_request = self._base_request() | {
+            "analysis_type": "full_repository",
+            "is_private": not await self.github.is_public_repo(),  # Let API know repo visibility
+        }
 
-        analysis_request = {
-            "repository": repository_url,
+        return await self._submit(analysis_request)
+
+    def _repository_url(self) -> str:
+        """Convert repo name to full GitHub URL if needed."""
+        if self._repo_url is None:
+            repository_url = self.github.repo_name
+            if not repository_url.startswith("https://"):
+                repository_url = f"https://github.com/{repository_url}"
+            self._repo_url = repository_url
+        return self._repo_url
+
+    def _base_request(self) -> Dict[str, Any]:
+        """Fields shared by every analysis request."""
+        return {
+            "repository": self._repository_url(),
             "github_token": self.github.token,  # Pass token for API access
-            "analysis_type": "full_repository",
-            "is_private": not self.github.is_public_repo(),  # Let API know repo visibility
         }
 
+    def _empty_result(self) -> AnalysisResult:
+        """Result for when there is nothing to analyze."""
+        return AnalysisResult(
+            threat_count=0,
+            threats=[],
+            analysis_id="",
+            usage_info={},
+            is_limited=False,
+            limitation_notice=None,
+        )
+
+    async def _submit(self, analysis_request: Dict[str, Any]) -> AnalysisResult:
+        """Submit an analysis request to the STRIDE API and shape the result."""
         try:
-            # Submit to STRIDE API
             result = await self.stride.analyze(analysis_request)
-
-            # Process results using new API response format
-            threats = result.get("threats", [])
-            summary = result.get("summary", {})
-
-            # Check if results were truncated by the API
-            is_limited = result.get("truncated", False)
-            upgrade_message = result.get("upgrade_message")
-            limitation_notice = result.get("limitation_notice")
-
-            return AnalysisResult(
-                threat_count=summary.get("total", len(threats)),
-                threats=threats,
-                analysis_id=result.get("analysis_id", ""),
-                usage_info=result.get("metadata", {}),
-                is_limited=is_limited,
-                upgrade_message=upgrade_message,
-                limitation_notice=limitation_notice,
-            )
-
         except PaymentRequiredError:
             # Return a special result indicating limit reached
             return AnalysisResult(
@@ -210,3 +133,18 @@ class ActionAnalyzer:
                 upgrade_message="Monthly analysis limit reached. Upgrade to continue analyzing.",
                 limitation_notice=None,
             )
+
+        # Process results using new API response format
+        threats = result.get("threats", [])
+        summary = result.get("summary", {})
+
+        # Check if results were truncated by the API
+        return AnalysisResult(
+            threat_count=summary.get("total", len(threats)),
+            threats=threats,
+            analysis_id=result.get("analysis_id", ""),
+            usage_info=result.get("metadata", {}),
+            is_limited=result.get("truncated", False),
+            upgrade_message=result.get("upgrade_message"),
+            limitation_notice=result.get("limitation_notice"),
+        )
@@ -2,94 +2,274 @@
 GitHub Client for STRIDE-GPT Action
 """
 
-from typing import List, Dict, Any, Optional
-from github import Github, PullRequest, Repository, Issue
+import os
+import re
+import time
+import asyncio
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from urllib.parse import quote
+from typing import AsyncIterator, Iterator, List, Dict, Any, Optional, Tuple
+import httpx
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from .stride_client import _wait_retry_after, parse_retry_after
+
+# Number of items requested per page from paginated REST endpoints
+PER_PAGE = 100
+
+# Extracts the last page number from a REST API "Link" response header
+_LAST_PAGE_RE = re.compile(r'[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
+
+class _RetryableStatusError(httpx.HTTPStatusError):
+    """A throttled or transient GitHub response that is worth retrying."""
+
+    def __init__(self, response: httpx.Response, retry_after: Optional[float]):
+        super().__init__(
+            f"GitHub returned {response.status_code} for {response.request.url}",
+            request=response.request,
+            response=response,
+        )
+        # Seconds GitHub asked us to wait, if it said
+        self.retry_after = retry_after
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Return how long a GitHub response asks us to wait, if it says."""
+    delay = parse_retry_after(response.headers)
+    if delay is None and response.headers.get("x-ratelimit-remaining") == "0":
+        try:
+            reset = float(response.headers["x-ratelimit-reset"])
+        except (KeyError, ValueError):
+            return None
+        delay = max(0.0, reset - time.time())
+    return delay
+
+
+def _check_retryable(response: httpx.Response) -> None:
+    """Raise for secondary rate limits and server errors so they are retried."""
+    if response.status_code >= 500:
+        raise _RetryableStatusError(response, None)
+    if response.status_code in (403, 429):
+        # A bare 403 is a permissions problem; rate limits say when to retry
+        retry_after = _retry_after(response)
+        if (
+            retry_after is not None
+            or response.headers.get("x-ratelimit-remaining") == "0"
+        ):
+            raise _RetryableStatusError(response, retry_after)
+
+
+def _analyzable_files(batch: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Trim a page of PR files to the fields we use, skipping removed ones."""
+    for file in batch:
+        # Only include files we can analyze
+        if file["status"] == "removed":
+            continue
+
+        yield {
+            "filename": file["filename"],
+            "status": file["status"],
+            "additions": file["additions"],
+            "deletions": file["deletions"],
+            "changes": file["changes"],
+            "patch": file.get("patch"),
+            "contents_url": file["contents_url"],
+        }
 
 
 class GitHubClient:
     """Client for interacting with GitHub API."""
 
-    def __init__(self, token: str, repo_name: str):
+    def __init__(
+        self,
+        token: str,
+        repo_name: str,
+        api_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        limiter: Optional[asyncio.Semaphore] = None,
+    ):
         self.token = token
-        self.github = Github(token)
-        self.repo = self.github.get_repo(repo_name)
         self.repo_name = repo_name
+        self.api_url = api_url or os.environ.get(
+            "GITHUB_API_URL", "https://api.github.com"
+        )
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+            "User-Agent": "STRIDE-GPT-Action/1.0",
+        }
+        # Reuse the caller's pooled client if given, otherwise own one
+        self._owns_client = http_client is None
+        self.http_client = http_client or httpx.AsyncClient()
+        self.limiter = limiter
+        # Repository metadata and PR/issue objects fetched during this run
+        self._repo: Optional[Dict[str, Any]] = None
+        self._pulls: Dict[int, Dict[str, Any]] = {}
+        self._issues: Dict[int, Dict[str, Any]] = {}
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client if this client created it."""
+        if self._owns_client:
+            await self.http_client.aclose()
 
-    def get_pr(self, pr_number: int) -> PullRequest.PullRequest:
+    async def _api_request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Send a GitHub API request within the shared concurrency limit."""
+        async with AsyncExitStack() as stack:
+            if self.limiter is not None:
+                await stack.enter_async_context(self.limiter)
+            # Back off while holding the slot, so a throttled burst slows
+            # down instead of freeing room for yet more requests
+            return await self._send(
+                method, url, headers={**self.headers, **(headers or {})}, **kwargs
+            )
+
+    @retry(
+        stop=stop_after_attempt(3),
+        # Server-requested delays are capped at MAX_RETRY_AFTER
+        wait=_wait_retry_after(wait_exponential(multiplier=1, min=1, max=8)),
+        retry=retry_if_exception_type((httpx.TransportError, _RetryableStatusError)),
+        reraise=True,
+    )
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send one request, retrying as PyGithub's ``GithubRetry`` used to.
+
+        Secondary rate limits, server errors and transport failures are
+        retried; other responses are returned for the caller to check.
+        """
+        response = await self.http_client.request(method, url, timeout=30.0, **kwargs)
+        _check_retryable(response)
+        return response
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send a request to a repository REST endpoint."""
+        return await self._api_request(
+            method, f"{self.api_url}/repos/{self.repo_name}{path}", **kwargs
+        )
+
+    async def _get_json(
+        self, path: str, params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Any, str]:
+        """GET a repository REST endpoint.
+
+        Returns the decoded body and the response's ``Link`` header.
+        """
+        response = await self._request("GET", path, params=params)
+        response.raise_for_status()
+        return response.json(), response.headers.get("link", "")
+
+    async def get_pr(self, pr_number: int) -> Dict[str, Any]:
         """Get a pull request by number."""
-        return self.repo.get_pull(pr_number)
+        if pr_number not in self._pulls:
+            self._pulls[pr_number], _ = await self._get_json(f"/pulls/{pr_number}")
+        return self._pulls[pr_number]
 
-    def get_pr_files(self, pr_number: int) -> List[Dict[str, Any]]:
-        """Get list of files changed in a PR."""
-        pr = self.get_pr(pr_number)
-        files = []
-
-        for file in pr.get_files():
-            # Only include files we can analyze
-            if file.status == "removed":
-                continue
-
-            files.append(
-                {
-                    "filename": file.filename,
-                    "status": file.status,
-                    "additions": file.additions,
-                    "deletions": file.deletions,
-                    "changes": file.changes,
-                    "patch": file.patch,
-                    "contents_url": file.contents_url,
-                }
+    async def iter_pr_files(self, pr_number: int) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the files changed in a PR as their pages arrive."""
+        path = f"/pulls/{pr_number}/files"
+        first_page, link = await self._get_json(path, {"per_page": PER_PAGE, "page": 1})
+        for file in _analyzable_files(first_page):
+            yield file
+
+        # The first page tells us how many pages there are; fetch the rest at once
+        match = _LAST_PAGE_RE.search(link)
+        if match:
+            rest = await asyncio.gather(
+                *(
+                    self._get_json(path, {"per_page": PER_PAGE, "page": page})
+                    for page in range(2, int(match.group(1)) + 1)
+                )
             )
+            for batch, _ in rest:
+                for file in _analyzable_files(batch):
+                    yield file
+
+    async def get_pr_files(self, pr_number: int) -> List[Dict[str, Any]]:
+        """Get list of files changed in a PR."""
+        return [file async for file in self.iter_pr_files(pr_number)]
 
-        return files
+    async def has_pr_files(self, pr_number: int) -> bool:
+        """Check if a PR changes any analyzable files, stopping at the first."""
+        files = self.iter_pr_files(pr_number)
+        try:
+            async for _ in files:
+                return True
+            return False
+        finally:
+            await files.aclose()
 
-    def get_file_content(self, path: str, ref: Optional[str] = None) -> str:
+    async def get_file_content(self, path: str, ref: Optional[str] = None) -> str:
         """Get content of a file from the repository."""
         try:
-            if ref:
-                contents = self.repo.get_contents(path, ref=ref)
-            else:
-                contents = self.repo.get_contents(path)
-
-            if contents.encoding == "base64":
-                import base64
-
-                return base64.b64decode(contents.content).decode("utf-8")
-            else:
-                return contents.decoded_content.decode("utf-8")
-        except Exception:
+            # Ask for the raw bytes so neither side has to base64 the file;
+            # quote the path so "#", "?" and "%" stay part of the file name
+            response = await self._request(
+                "GET",
+                f"/contents/{quote(path)}",
+                params={"ref": ref} if ref else None,
+                headers={"Accept": "application/vnd.github.raw"},
+            )
+            response.raise_for_status()
+            return response.content.decode("utf-8", errors="replace")
+        except httpx.HTTPStatusError:
+            # Missing or unreadable files are analyzed as empty
             return ""
 
-    def create_comment(self, pr_number: int, body: str) -> str:
-        """Create a comment on a PR."""
-        pr = self.get_pr(pr_number)
-        comment = pr.create_issue_comment(body)
-        return comment.html_url
+    async def create_comment(self, issue_number: int, body: str) -> str:
+        """Create a comment on a PR or issue and return its URL.
+
+        PRs are issues to the REST API, so both share the issue comments
+        endpoint.
+        """
+        response = await self._request(
+            "POST", f"/issues/{issue_number}/comments", json={"body": body}
+        )
+        response.raise_for_status()
+        return response.json()["html_url"]
 
-    def check_rate_limit(self) -> Dict[str, Any]:
+    async def check_rate_limit(self) -> Dict[str, Any]:
         """Check GitHub API rate limit."""
-        rate_limit = self.github.get_rate_limit()
+        response = await self._api_request("GET", f"{self.api_url}/rate_limit")
+        response.raise_for_status()
+        core = response.json()["resources"]["core"]
         return {
-            "remaining": rate_limit.core.remaining,
-            "limit": rate_limit.core.limit,
-            "reset": rate_limit.core.reset,
+            "remaining": core["remaining"],
+            "limit": core["limit"],
+            "reset": datetime.fromtimestamp(core["reset"], timezone.utc),
         }
 
-    def is_public_repo(self) -> bool:
+    async def get_repo(self) -> Dict[str, Any]:
+        """Get the repository metadata."""
+        if self._repo is None:
+            self._repo, _ = await self._get_json("")
+        return self._repo
+
+    async def is_public_repo(self) -> bool:
         """Check if the repository is public."""
-        return not self.repo.private
+        return not (await self.get_repo())["private"]
 
-    def get_issue(self, issue_number: int) -> Issue.Issue:
+    async def get_issue(self, issue_number: int) -> Dict[str, Any]:
         """Get an issue by number."""
-        return self.repo.get_issue(issue_number)
+        if issue_number not in self._issues:
+            self._issues[issue_number], _ = await self._get_json(
+                f"/issues/{issue_number}"
+            )
+        return self._issues[issue_number]
 
-    def get_issue_description(self, issue_number: int) -> str:
+    async def get_issue_description(self, issue_number: int) -> str:
         """Get the description/body of an issue."""
-        issue = self.get_issue(issue_number)
-        return issue.body or ""
-
-    def create_issue_comment(self, issue_number: int, body: str) -> str:
-        """Create a comment on an issue."""
-        issue = self.get_issue(issue_number)
-        comment = issue.create_comment(body)
-        return comment.html_url
+        issue = await self.get_issue(issue_number)
+        return issue.get("body") or ""
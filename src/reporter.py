@@ -2,44 +2,20 @@
 Comment Reporter - Formats and posts analysis results to GitHub
 """
 
-from typing import Dict, Any
-from datetime import datetime
-from .github_client import GitHubClient
-from .analyzer import AnalysisResult
-from .stride_client import StrideClient
+import re
+from collections import Counter
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
 
+if TYPE_CHECKING:
+    from .analyzer import AnalysisResult
+    from .github_client import GitHubClient
+    from .stride_client import StrideClient
 
-class CommentReporter:
-    """Formats and posts analysis results as GitHub comments."""
-
-    def __init__(self, github_client: GitHubClient, stride_client: StrideClient = None):
-        self.github = github_client
-        self.stride = stride_client
-
-    async def post_analysis_comment(
-        self, issue_number: int, result: AnalysisResult, is_pull_request: bool = True
-    ) -> str:
-        """Post analysis results as a comment on issue or PR."""
-
-        # Check if limit was reached
-        if result.usage_info.get("limit_reached"):
-            body = self._format_limit_reached_comment()
-        elif result.threat_count == 0:
-            body = await self._format_no_threats_comment(result)
-        else:
-            body = await self._format_threats_comment(result)
-
-        # Use appropriate method based on whether it's a PR or issue
-        if is_pull_request:
-            return self.github.create_comment(issue_number, body)
-        else:
-            return self.github.create_issue_comment(issue_number, body)
-
-    async def post_help_comment(
-        self, issue_number: int, is_pull_request: bool = True
-    ) -> str:
-        """Post help information as a comment on issue or PR."""
-        body = """## 🛡️ STRIDE GPT Help
+# Static comment bodies, built once at import time
+_HELP_BODY = """## 🛡️ STRIDE GPT Help
 
 ### Available Commands
 - `@stride-gpt analyze` - Run security analysis on changed files
@@ -62,51 +38,372 @@ Upgrade to a paid plan for:
 
 [View Pricing →](https://stridegpt.ai/pricing)"""
 
-        # Use appropriate method based on whether it's a PR or issue
-        if is_pull_request:
-            return self.github.create_comment(issue_number, body)
-        else:
-            return self.github.create_issue_comment(issue_number, body)
+_LIMIT_REACHED_BODY = """## 🛑 Monthly Analysis Limit Reached
 
-    async def post_status_comment(
-        self, issue_number: int, usage: Dict[str, Any], is_pull_request: bool = True
-    ) -> str:
-        """Post usage status as a comment on issue or PR."""
-        analyses_used = usage.get("analyses_used", 0)
-        analyses_limit = usage.get("analyses_limit", 20)
-        remaining = analyses_limit - analyses_used
+You've used all 20 free analyses for this month. Your limit will reset at the beginning of next month.
 
-        # Get trend emoji
-        trend_emoji = self._get_trend_emoji(usage.get("usage_trend", "stable"))
+### Continue Analyzing Today
 
-        body = f"""## 📊 STRIDE GPT Usage Status
+Upgrade to a paid plan for:
+- ✅ **High-volume analysis plans**
+- ✅ **DREAD risk scoring**
+- ✅ **State-of-the-art LLM access**
+- ✅ **Detailed mitigation steps**
+- ✅ **Private repository support**
+- ✅ **Priority support**
+
+### Pricing Plans
+- **Starter** ($29/month): 500 analyses, all Pro features
+- **Pro** ($99/month): 2,500 analyses, API access
+- **Enterprise**: Custom pricing - [Contact us](https://stridegpt.ai/contact) for volume discounts
+
+[Upgrade Now →](https://stridegpt.ai/pricing)"""
+
+_UPGRADE_PROMPT = """### 📈 Want More Detailed Threat Modeling?
+Upgrade to a paid plan for:
+- ✨ DREAD risk scoring
+- 🛠️ Detailed mitigation steps
+- 🔒 Private repository support
+- 🧠 State-of-the-art LLM access
+- 📊 Risk prioritization
+
+[Get Started →](https://stridegpt.ai/pricing)"""
+
+# Upgrade prompt as appended to the threats comment
+_UPGRADE_PROMPT_BLOCK = f"---\n\n{_UPGRADE_PROMPT}\n"
+
+# Upgrade section for the "no threats" comment, keyed by plan
+_NO_THREATS_SECTIONS = MappingProxyType(
+    {
+        "free": """### 💡 Want Deeper Threat Modeling?
+
+While no obvious threats were found, paid plans offer:
+- 🔍 **Deep code analysis** with AI-powered pattern recognition
+- 📊 **DREAD scoring** for risk prioritization  
+- 🛠️ **Detailed remediation** guidance
+- 🔒 **Private repository** support
+- 🧠 **State-of-the-art LLMs** for deeper analysis
+
+[Upgrade to Starter →](https://stridegpt.ai/pricing)""",
+        "starter": """### 💡 Enhanced Analysis Available
+
+Consider upgrading to Pro for:
+- 🧠 **State-of-the-art LLMs** for deeper analysis
+- 🛠️ **Detailed remediation** guidance  
+- 📊 **Advanced risk analysis**
+- 🔍 **Enhanced pattern recognition**
+
+[Upgrade to Pro →](https://stridegpt.ai/pricing)""",
+        "pro": """### ✨ Pro Analysis Complete
+
+You're using our most advanced threat modeling capabilities:
+- ✅ **State-of-the-art LLMs** enabled
+- ✅ **DREAD scoring** available
+- ✅ **Comprehensive analysis** complete
+- ✅ **Advanced pattern recognition** applied
+
+Need custom features? [Contact Enterprise Sales →](https://stridegpt.ai/contact)""",
+        "enterprise": """### 🏢 Enterprise Analysis Complete
+
+You're using our highest-tier threat modeling:
+- ✅ **Custom analysis rules** applied
+- ✅ **Enterprise-grade LLMs** enabled
+- ✅ **Advanced threat modeling** complete
+- ✅ **Dedicated support** available
+
+[Contact your account manager](https://stridegpt.ai/contact) for additional customizations.""",
+    }
+)
+
+# Fallback for unknown plans
+_DEFAULT_NO_THREATS_SECTION = """### 📊 Analysis Complete
+
+Your current plan provides comprehensive threat modeling. No obvious security threats were found."""
+
+# Opening of the status comment; the remaining sections are optional
+_STATUS_HEADER_TEMPLATE = """## 📊 STRIDE GPT Usage Status
 
 ### Current Month
 - **Analyses Used**: {analyses_used} of {analyses_limit}
 - **Remaining**: {remaining}
-- **Plan**: {usage.get("plan", "Free").title()}
+- **Plan**: {plan}
 
 ### Billing Period  
-- **Period**: {self._format_date(usage.get("period_start"))} to {self._format_date(usage.get("period_end"))}
-- **Days Remaining**: {self._calculate_days_remaining(usage.get("period_end"))}
+- **Period**: {period_start} to {period_end}
+- **Days Remaining**: {days_remaining}"""
+
+# Account details when the API reports no key or activity dates
+_ACCOUNT_ACTIVE_SECTION = """### 👤 Account Details
+- **Account**: Active"""
+
+# Always available features, then plan-specific ones for the status comment
+_BASE_FEATURES = ("✅ Basic threat modeling", "✅ STRIDE methodology")
+_PLAN_FEATURES = MappingProxyType(
+    {
+        "free": (
+            "✅ Simple severity ratings",
+            "🔒 DREAD scoring (Starter+ feature)",
+            "🔒 State-of-the-art LLMs (Pro+ feature)",
+            "🔒 Detailed mitigations (Pro+ feature)",
+            "🔒 Private repositories (Starter+ feature)",
+        ),
+        "starter": (
+            "✅ DREAD risk scoring",
+            "✅ Advanced severity analysis",
+            "✅ Private repositories",
+            "🔒 State-of-the-art LLMs (Pro+ feature)",
+            "🔒 Detailed mitigations (Pro+ feature)",
+        ),
+        "pro": (
+            "✅ DREAD risk scoring",
+            "✅ State-of-the-art LLM access",
+            "✅ Detailed mitigation steps",
+            "✅ Private repositories",
+            "🔒 Custom rules (Enterprise feature)",
+        ),
+        "enterprise": (
+            "✅ All Pro features included",
+            "✅ Custom volume pricing",
+            "✅ Dedicated support",
+            "📞 Contact us for custom requirements",
+        ),
+    }
+)
+
+
+def _feature_access_section(features: Tuple[str, ...]) -> str:
+    """Render the feature access section for a list of features."""
+    return "### 🔓 Feature Access\n" + "\n".join(f"- {line}" for line in features)
+
+
+_FEATURE_ACCESS_SECTIONS = MappingProxyType(
+    {
+        plan: _feature_access_section(_BASE_FEATURES + features)
+        for plan, features in _PLAN_FEATURES.items()
+    }
+)
+_DEFAULT_FEATURE_ACCESS_SECTION = _feature_access_section(_BASE_FEATURES)
+
+# Severity -> (sort order, emoji, display label) for the analysis comment
+_SEVERITY_META = MappingProxyType(
+    {
+        "critical": (0, "🚨", "CRITICAL"),
+        "high": (1, "🔴", "HIGH"),
+        "medium": (2, "🟡", "MEDIUM"),
+        "low": (3, "🟢", "LOW"),
+        "info": (4, "ℹ️", "INFO"),
+    }
+)
+
+# Usage trend -> emoji for the status comment
+_TREND_EMOJI = MappingProxyType({"up": "⬆️", "down": "⬇️", "stable": "➡️"})
+
+
+def _severity_meta(severity: str) -> Tuple[int, str, str]:
+    """Look up a lowercased severity's sort order, emoji and label."""
+    try:
+        return _SEVERITY_META[severity]
+    except KeyError:
+        # Unknown severities sort and render like medium, under their own name
+        return (2, "🟡", severity.upper())
+
+
+def _rank_threats(
+    threats: List[Dict[str, Any]],
+) -> List[Tuple[int, int, str, str, str, Dict[str, Any]]]:
+    """Sort threats by severity (Critical first, Info last).
+
+    Each threat's severity is normalized once; the returned tuples carry the
+    lowercased severity, emoji and label for counting and rendering, and the
+    index keeps equal severities in their original order.
+    """
+    ranked = []
+    for i, threat in enumerate(threats):
+        severity = threat.get("severity", "medium").lower()
+        order, emoji, label = _severity_meta(severity)
+        ranked.append((order, i, severity, emoji, label, threat))
+    ranked.sort()
+    return ranked
+
+
+# One rendered threat in the analysis comment; optional lines end in "\n"
+_THREAT_TEMPLATE = (
+    "#### {emoji} {severity}: {title}\n"
+    "**Category**: {category}\n"
+    "{dread}"
+    "{file}"
+    "**Description**: {description}\n"
+)
+_DREAD_LINE = "**DREAD Score**: {}/10\n"
+_FILE_LINE = "**File**: `{}`\n"
+
+# Trailing blocks of the analysis comment, each appended as a single line
+_LIMITATION_NOTICE_BLOCK = (
+    "---\n\n⚠️ **{}**\n\n[Upgrade Now →](https://stridegpt.ai/pricing)\n"
+)
+_FREE_TIER_LIMIT_BLOCK = """---
+
+⚠️ **Free Tier Limit Reached**: Only 3 threats shown per analysis
+
+💡 **Upgrade to see all threats**: Get comprehensive analysis with enhanced threat modeling, DREAD scoring, and state-of-the-art LLMs for deeper insights.
+
+[Upgrade Now →](https://stridegpt.ai/pricing)
+"""
+_PROMPT_DETAILS_BLOCK = """
+<details>
+<summary>🔍 View LLM Input Prompt (for debugging)</summary>
+
+```
+{}
+```
+</details>
+"""
+
+# UTC timestamps as returned by the API; fractional seconds are ignored
+_ISO_UTC_RE = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:\.\d+)?(?:Z|\+00:00)?$"
+)
+
+
+def _render_file_line(threat: Dict[str, Any]) -> str:
+    """Render a threat's file location, if it's actually available and useful."""
+    file = threat.get("file")
+    if not file or file == "Unknown":
+        return ""
+    line = threat.get("line", "")
+    if line and line != "?":
+        return _FILE_LINE.format(f"{file}:{line}")
+    return _FILE_LINE.format(file)
+
+
+def _parse_date(value: Any) -> datetime:
+    """Parse an API timestamp, treating ones without an offset as UTC."""
+    if not isinstance(value, str):
+        return value  # Already a datetime object
+
+    # Fast path for the API's usual "2024-01-31T00:00:00[.ffffff][Z]" shape
+    match = _ISO_UTC_RE.match(value)
+    if match:
+        return datetime(*map(int, match.groups()), tzinfo=timezone.utc)
+
+    # Handle various other date formats
+    if value.endswith("Z"):
+        # Remove Z and replace with +00:00 for UTC
+        value = value.replace("Z", "+00:00")
+    elif not value.endswith("+00:00") and not value.endswith("UTC"):
+        value = value + "+00:00"
+    return datetime.fromisoformat(value)
+
+
+# The same period dates are parsed for display and for days remaining
+_parse_date_cached = lru_cache(maxsize=512)(_parse_date)
 
-{self._get_usage_analytics_section(usage)}
 
-{self._get_feature_access_section(usage)}
+@lru_cache(maxsize=512)
+def _format_date_cached(date_str: str) -> str:
+    """Format date for user-friendly display."""
+    if date_str and date_str != "N/A":
+        try:
+            return _parse_date(date_str).strftime("%b %d, %Y")
+        except (ValueError, AttributeError):
+            return date_str  # Return as-is if parsing fails
+    return "N/A"
+
+
+def _days_remaining(period_end: str, now: Optional[datetime] = None) -> str:
+    """Calculate days remaining in the current period as of ``now``."""
+    if period_end and period_end != "N/A":
+        try:
+            end_date = _parse_date_cached(period_end)
+            if end_date.tzinfo is None:
+                now = datetime.now()  # Naive datetimes are local time
+            elif now is None:
+                now = datetime.now(timezone.utc)
+            days_left = (end_date - now).days
+
+            if days_left > 0:
+                return f"{days_left} days"
+            elif days_left == 0:
+                return "Last day"
+            else:
+                return "Period ended"
+        except (ValueError, AttributeError, TypeError):
+            return "Unknown"
+    return "N/A"
 
-{self._get_account_info_section(usage)}
 
-{self._get_upgrade_prompt() if usage.get("plan", "free").lower() == "free" else ""}"""
+class CommentReporter:
+    """Formats and posts analysis results as GitHub comments."""
 
-        # Use appropriate method based on whether it's a PR or issue
-        if is_pull_request:
-            return self.github.create_comment(issue_number, body)
+    def __init__(
+        self,
+        github_client: "GitHubClient",
+        stride_client: Optional["StrideClient"] = None,
+    ):
+        self.github = github_client
+        self.stride = stride_client
+
+    async def post_analysis_comment(
+        self, issue_number: int, result: "AnalysisResult"
+    ) -> str:
+        """Post analysis results as a comment on issue or PR."""
+
+        # Check if limit was reached
+        if result.usage_info.get("limit_reached"):
+            body = _LIMIT_REACHED_BODY
         else:
-            return self.github.create_issue_comment(issue_number, body)
+            # Plan header and usage footer are shared by both comment kinds
+            plan_name, usage_footer = await self._resolve_usage(result)
+            if result.threat_count == 0:
+                body = self._format_no_threats_comment(result, plan_name, usage_footer)
+            else:
+                body = self._format_threats_comment(result, plan_name, usage_footer)
+
+        return await self.github.create_comment(issue_number, body)
+
+    async def post_help_comment(self, issue_number: int) -> str:
+        """Post help information as a comment on issue or PR."""
+        body = _HELP_BODY
+
+        return await self.github.create_comment(issue_number, body)
 
-    async def post_error_comment(
-        self, issue_number: int, error_message: str, is_pull_request: bool = True
+    async def post_status_comment(
+        self, issue_number: int, usage: Dict[str, Any]
     ) -> str:
+        """Post usage status as a comment on issue or PR."""
+        analyses_used = usage.get("analyses_used", 0)
+        analyses_limit = usage.get("analyses_limit", 20)
+        remaining = analyses_limit - analyses_used
+        # Read the clock once for this comment
+        now = datetime.now(timezone.utc)
+
+        header = _STATUS_HEADER_TEMPLATE.format_map(
+            {
+                "analyses_used": analyses_used,
+                "analyses_limit": analyses_limit,
+                "remaining": remaining,
+                "plan": usage.get("plan", "Free").title(),
+                "period_start": self._format_date(usage.get("period_start")),
+                "period_end": self._format_date(usage.get("period_end")),
+                "days_remaining": self._calculate_days_remaining(
+                    usage.get("period_end"), now=now
+                ),
+            }
+        )
+
+        # Only non-empty sections are included, separated by a blank line
+        sections = [
+            header,
+            self._get_usage_analytics_section(usage),
+            self._get_feature_access_section(usage),
+            self._get_account_info_section(usage),
+            _UPGRADE_PROMPT if usage.get("plan", "free").lower() == "free" else "",
+        ]
+        body = "\n\n".join(section for section in sections if section)
+
+        return await self.github.create_comment(issue_number, body)
+
+    async def post_error_comment(self, issue_number: int, error_message: str) -> str:
         """Post error message as a comment on issue or PR."""
         body = f"""## ❌ STRIDE GPT Error
 
@@ -117,46 +414,43 @@ Upgrade to a paid plan for:
 - Visit [documentation](https://stridegpt.ai/docs)
 - Contact [support](https://stridegpt.ai/support)"""
 
-        # Use appropriate method based on whether it's a PR or issue
-        if is_pull_request:
-            return self.github.create_comment(issue_number, body)
-        else:
-            return self.github.create_issue_comment(issue_number, body)
+        return await self.github.create_comment(issue_number, body)
 
-    async def _format_threats_comment(self, result: AnalysisResult) -> str:
-        """Format threats into a comment."""
-        severity_emoji = {
-            "critical": "🚨",
-            "high": "🔴",
-            "medium": "🟡",
-            "low": "🟢",
-            "info": "ℹ️",
-        }
-        severity_order = {"critical": 0, "high": 1, "medium": 2, "low": 3, "info": 4}
-
-        # Get current plan info from analysis result first, then fallback to API call
-        plan_name = "Free"  # Default fallback
-        if result.usage_info and result.usage_info.get("plan"):
-            plan_name = result.usage_info.get("plan").title()
-        else:
-            try:
-                if self.stride:
-                    current_usage = await self.stride.get_usage()
-                    plan_name = current_usage.get("plan", "free").title()
-            except Exception:
-                plan_name = "Free"
-
-        # Sort threats by severity (Critical first, Info last)
-        sorted_threats = sorted(
-            result.threats,
-            key=lambda t: severity_order.get(t.get("severity", "medium").lower(), 2),
+    async def _fetch_usage(self) -> Optional[Dict[str, Any]]:
+        """Fetch real-time usage, or None if it is unavailable."""
+        if not self.stride:
+            return None
+        try:
+            return await self.stride.get_usage()
+        except Exception:
+            return None
+
+    async def _resolve_usage(self, result: "AnalysisResult") -> Tuple[str, str]:
+        """Get the plan name and usage footer from a single usage lookup."""
+        current_usage = await self._fetch_usage()
+        return (
+            self._plan_name(result, current_usage),
+            self._get_usage_footer(result.usage_info, current_usage),
         )
 
+    def _plan_name(
+        self, result: "AnalysisResult", current_usage: Optional[Dict[str, Any]]
+    ) -> str:
+        """Get the plan name from the analysis result, then real-time usage."""
+        if result.usage_info and result.usage_info.get("plan"):
+            return result.usage_info.get("plan").title()
+        if current_usage is not None:
+            return current_usage.get("plan", "free").title()
+        return "Free"  # Default fallback
+
+    def _format_threats_comment(
+        self, result: "AnalysisResult", plan_name: str, usage_footer: str
+    ) -> str:
+        """Format threats into a comment."""
+        ranked = _rank_threats(result.threats)
+
         # Count threats by severity
-        severity_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0, "info": 0}
-        for threat in sorted_threats:
-            severity = threat.get("severity", "medium").lower()
-            severity_counts[severity] = severity_counts.get(severity, 0) + 1
+        severity_counts = Counter(severity for _, _, severity, _, _, _ in ranked)
 
         # Build comment
         lines = [
@@ -171,74 +465,43 @@ Upgrade to a paid plan for:
             "",
         ]
 
-        # Add each threat (already sorted by severity)
-        for threat in sorted_threats:
-            severity = threat.get("severity", "medium").lower()
-            emoji = severity_emoji.get(severity, "🟡")
-
-            # Only show file info if it's actually available and useful
-            file_info_parts = []
-            if threat.get("file") and threat.get("file") != "Unknown":
-                file_line = threat.get("line", "")
-                if file_line and file_line != "?":
-                    file_info_parts.append(
-                        f"**File**: `{threat.get('file')}:{file_line}`"
-                    )
-                else:
-                    file_info_parts.append(f"**File**: `{threat.get('file')}`")
-
-            # Build threat header with title and category
-            threat_info = [
-                f"#### {emoji} {severity.upper()}: {threat.get('title', 'Unknown Threat')}",
-                f"**Category**: {threat.get('category', 'Unknown')}",
-            ]
-
-            # Add DREAD score if available (for paid plans)
-            if threat.get("dread_score") is not None:
-                threat_info.append(f"**DREAD Score**: {threat.get('dread_score')}/10")
-
-            lines.extend(
-                threat_info
-                + file_info_parts
-                + [
-                    f"**Description**: {threat.get('description', 'No description provided')}",
-                    "",
-                ]
+        # Add each threat (already sorted by severity), one template fill each
+        for _, _, _, emoji, label, threat in ranked:
+            dread_score = threat.get("dread_score")
+            lines.append(
+                _THREAT_TEMPLATE.format_map(
+                    {
+                        "emoji": emoji,
+                        "severity": label,
+                        "title": threat.get("title", "Unknown Threat"),
+                        "category": threat.get("category", "Unknown"),
+                        # Add DREAD score if available (for paid plans)
+                        "dread": (
+                            _DREAD_LINE.format(dread_score)
+                            if dread_score is not None
+                            else ""
+                        ),
+                        "file": _render_file_line(threat),
+                        "description": threat.get(
+                            "description", "No description provided"
+                        ),
+                    }
+                )
             )
 
         # Add limitation notice if provided by the API
         if result.limitation_notice:
-            lines.extend(
-                [
-                    "---",
-                    "",
-                    f"⚠️ **{result.limitation_notice}**",
-                    "",
-                    "[Upgrade Now →](https://stridegpt.ai/pricing)",
-                    "",
-                ]
-            )
+            lines.append(_LIMITATION_NOTICE_BLOCK.format(result.limitation_notice))
         elif result.is_limited:
             # Fallback to previous behavior if no limitation notice is provided
-            lines.extend(
-                [
-                    "---",
-                    "",
-                    "⚠️ **Free Tier Limit Reached**: Only 3 threats shown per analysis",
-                    "",
-                    "💡 **Upgrade to see all threats**: Get comprehensive analysis with enhanced threat modeling, DREAD scoring, and state-of-the-art LLMs for deeper insights.",
-                    "",
-                    "[Upgrade Now →](https://stridegpt.ai/pricing)",
-                    "",
-                ]
-            )
+            lines.append(_FREE_TIER_LIMIT_BLOCK)
 
         # Add upgrade prompt for free users only
         current_plan = (
             result.usage_info.get("plan", "free") if result.usage_info else "free"
         )
         if current_plan.lower() == "free":
-            lines.extend(["---", "", self._get_upgrade_prompt(), ""])
+            lines.append(_UPGRADE_PROMPT_BLOCK)
 
         # Add analysis details if available
         if result.usage_info:
@@ -267,44 +530,23 @@ Upgrade to a paid plan for:
                 details.append(f"🤖 Model: {result.usage_info['model_used']}")
 
             if details:
-                lines.extend(["", f"<sub>{' | '.join(details)}</sub>", ""])
+                lines.append(f"\n<sub>{' | '.join(details)}</sub>\n")
 
             # Add collapsible input prompt for debugging
             if result.usage_info.get("input_prompt"):
-                lines.extend(
-                    [
-                        "",
-                        "<details>",
-                        "<summary>🔍 View LLM Input Prompt (for debugging)</summary>",
-                        "",
-                        "```",
-                        result.usage_info["input_prompt"],
-                        "```",
-                        "</details>",
-                        "",
-                    ]
+                lines.append(
+                    _PROMPT_DETAILS_BLOCK.format(result.usage_info["input_prompt"])
                 )
 
         # Add real-time usage footer
-        usage_footer = await self._get_usage_footer(result.usage_info)
         lines.append(usage_footer)
 
         return "\n".join(lines)
 
-    async def _format_no_threats_comment(self, result: AnalysisResult) -> str:
+    def _format_no_threats_comment(
+        self, result: "AnalysisResult", plan_name: str, usage_footer: str
+    ) -> str:
         """Format comment when no threats are found."""
-        # Get current plan info from analysis result first, then fallback to API call
-        plan_name = "Free"  # Default fallback
-        if result.usage_info and result.usage_info.get("plan"):
-            plan_name = result.usage_info.get("plan").title()
-        else:
-            try:
-                if self.stride:
-                    current_usage = await self.stride.get_usage()
-                    plan_name = current_usage.get("plan", "free").title()
-            except Exception:
-                plan_name = "Free"
-
         # Add analysis details if available
         if result.usage_info:
             details = []
@@ -331,9 +573,6 @@ Upgrade to a paid plan for:
             if result.usage_info.get("model_used"):
                 details.append(f"🤖 Model: {result.usage_info['model_used']}")
 
-        # Get real-time usage footer
-        usage_footer = await self._get_usage_footer(result.usage_info)
-
         # Generate appropriate messaging based on plan
         upgrade_section = self._get_no_threats_upgrade_section(plan_name.lower())
 
@@ -345,15 +584,9 @@ Upgrade to a paid plan for:
         # Add collapsible input prompt for debugging
         prompt_section = ""
         if result.usage_info and result.usage_info.get("input_prompt"):
-            prompt_section = f"""
-<details>
-<summary>🔍 View LLM Input Prompt (for debugging)</summary>
-
-```
-{result.usage_info["input_prompt"]}
-```
-</details>
-"""
+            prompt_section = _PROMPT_DETAILS_BLOCK.format(
+                result.usage_info["input_prompt"]
+            )
 
         return f"""## 🛡️ STRIDE GPT Threat Model Analysis ({plan_name} Tier)
 
@@ -371,171 +604,48 @@ Great job! No obvious security threats were found in the changed files.
 {prompt_section}
 {usage_footer}"""
 
-    def _format_limit_reached_comment(self) -> str:
-        """Format comment when usage limit is reached."""
-        return """## 🛑 Monthly Analysis Limit Reached
-
-You've used all 20 free analyses for this month. Your limit will reset at the beginning of next month.
-
-### Continue Analyzing Today
-
-Upgrade to a paid plan for:
-- ✅ **High-volume analysis plans**
-- ✅ **DREAD risk scoring**
-- ✅ **State-of-the-art LLM access**
-- ✅ **Detailed mitigation steps**
-- ✅ **Private repository support**
-- ✅ **Priority support**
-
-### Pricing Plans
-- **Starter** ($29/month): 500 analyses, all Pro features
-- **Pro** ($99/month): 2,500 analyses, API access
-- **Enterprise**: Custom pricing - [Contact us](https://stridegpt.ai/contact) for volume discounts
-
-[Upgrade Now →](https://stridegpt.ai/pricing)"""
-
-    def _get_upgrade_prompt(self) -> str:
-        """Get upgrade prompt for free tier users."""
-        return """### 📈 Want More Detailed Threat Modeling?
-Upgrade to a paid plan for:
-- ✨ DREAD risk scoring
-- 🛠️ Detailed mitigation steps
-- 🔒 Private repository support
-- 🧠 State-of-the-art LLM access
-- 📊 Risk prioritization
-
-[Get Started →](https://stridegpt.ai/pricing)"""
-
     def _get_no_threats_upgrade_section(self, plan: str) -> str:
         """Get appropriate upgrade section for no threats found, based on plan."""
-        if plan == "free":
-            return """### 💡 Want Deeper Threat Modeling?
-
-While no obvious threats were found, paid plans offer:
-- 🔍 **Deep code analysis** with AI-powered pattern recognition
-- 📊 **DREAD scoring** for risk prioritization  
-- 🛠️ **Detailed remediation** guidance
-- 🔒 **Private repository** support
-- 🧠 **State-of-the-art LLMs** for deeper analysis
-
-[Upgrade to Starter →](https://stridegpt.ai/pricing)"""
-        elif plan == "starter":
-            return """### 💡 Enhanced Analysis Available
-
-Consider upgrading to Pro for:
-- 🧠 **State-of-the-art LLMs** for deeper analysis
-- 🛠️ **Detailed remediation** guidance  
-- 📊 **Advanced risk analysis**
-- 🔍 **Enhanced pattern recognition**
-
-[Upgrade to Pro →](https://stridegpt.ai/pricing)"""
-        elif plan == "pro":
-            return """### ✨ Pro Analysis Complete
-
-You're using our most advanced threat modeling capabilities:
-- ✅ **State-of-the-art LLMs** enabled
-- ✅ **DREAD scoring** available
-- ✅ **Comprehensive analysis** complete
-- ✅ **Advanced pattern recognition** applied
-
-Need custom features? [Contact Enterprise Sales →](https://stridegpt.ai/contact)"""
-        elif plan == "enterprise":
-            return """### 🏢 Enterprise Analysis Complete
+        return _NO_THREATS_SECTIONS.get(plan, _DEFAULT_NO_THREATS_SECTION)
 
-You're using our highest-tier threat modeling:
-- ✅ **Custom analysis rules** applied
-- ✅ **Enterprise-grade LLMs** enabled
-- ✅ **Advanced threat modeling** complete
-- ✅ **Dedicated support** available
-
-[Contact your account manager](https://stridegpt.ai/contact) for additional customizations."""
-        else:
-            # Fallback for unknown plans
-            return """### 📊 Analysis Complete
-
-Your current plan provides comprehensive threat modeling. No obvious security threats were found."""
-
-    async def _get_usage_footer(self, usage_info: Dict[str, Any]) -> str:
+    def _get_usage_footer(
+        self, usage_info: Dict[str, Any], current_usage: Optional[Dict[str, Any]]
+    ) -> str:
         """Get usage footer for comments with real-time data."""
-        try:
-            # Fetch real-time usage data if stride client is available
-            if self.stride:
-                current_usage = await self.stride.get_usage()
-                analyses_used = current_usage.get("analyses_used", 0)
-                analyses_limit = current_usage.get("analyses_limit", 20)
-                plan = current_usage.get("plan", "free").title()
-            else:
-                # Fallback to metadata from analysis result
-                analyses_used = usage_info.get("analyses_used", 0)
-                analyses_limit = usage_info.get("analyses_limit", 20)
-                plan = usage_info.get("plan", "free").title()
-
-            return f"\n*You've used {analyses_used} of {analyses_limit} {plan.lower()} analyses this month*"
-        except Exception:
-            # Fallback to original behavior on error
+        if current_usage is not None:
+            # Real-time usage data from the stride client
+            analyses_used = current_usage.get("analyses_used", 0)
+            analyses_limit = current_usage.get("analyses_limit", 20)
+            plan = current_usage.get("plan", "free").title()
+        elif not self.stride:
+            # Fallback to metadata from analysis result
             analyses_used = usage_info.get("analyses_used", 0)
             analyses_limit = usage_info.get("analyses_limit", 20)
-            return f"\n*You've used {analyses_used} of {analyses_limit} free analyses this month*"
+            plan = usage_info.get("plan", "free").title()
+        else:
+            # Fallback to original behavior if the usage lookup failed
+            analyses_used = usage_info.get("analyses_used", 0)
+            analyses_limit = usage_info.get("analyses_limit", 20)
+            plan = "Free"
+
+        return f"\n*You've used {analyses_used} of {analyses_limit} {plan.lower()} analyses this month*"
 
     def _format_date(self, date_str: str) -> str:
         """Format date for user-friendly display."""
-        if date_str and date_str != "N/A":
-            try:
-                # Handle various date formats
-                if isinstance(date_str, str):
-                    # Remove Z and replace with +00:00 for UTC
-                    if date_str.endswith("Z"):
-                        date_str = date_str.replace("Z", "+00:00")
-                    elif not date_str.endswith("+00:00") and not date_str.endswith(
-                        "UTC"
-                    ):
-                        date_str = date_str + "+00:00"
-
-                    date_obj = datetime.fromisoformat(date_str)
-                else:
-                    date_obj = date_str  # Already a datetime object
-
-                return date_obj.strftime("%b %d, %Y")
-            except (ValueError, AttributeError):
-                return date_str  # Return as-is if parsing fails
-        return "N/A"
-
-    def _calculate_days_remaining(self, period_end: str) -> str:
+        return _format_date_cached(date_str)
+
+    def _calculate_days_remaining(
+        self, period_end: str, *, now: Optional[datetime] = None
+    ) -> str:
         """Calculate days remaining in the current period."""
-        if period_end and period_end != "N/A":
-            try:
-                # Handle various date formats
-                if isinstance(period_end, str):
-                    if period_end.endswith("Z"):
-                        period_end = period_end.replace("Z", "+00:00")
-                    elif not period_end.endswith("+00:00") and not period_end.endswith(
-                        "UTC"
-                    ):
-                        period_end = period_end + "+00:00"
-
-                    end_date = datetime.fromisoformat(period_end)
-                else:
-                    end_date = period_end  # Already a datetime object
-
-                now = (
-                    datetime.now(end_date.tzinfo) if end_date.tzinfo else datetime.now()
-                )
-                days_left = (end_date - now).days
-
-                if days_left > 0:
-                    return f"{days_left} days"
-                elif days_left == 0:
-                    return "Last day"
-                else:
-                    return "Period ended"
-            except (ValueError, AttributeError):
-                return "Unknown"
-        return "N/A"
+        return _days_remaining(period_end, now)
 
     def _get_trend_emoji(self, trend: str) -> str:
         """Get emoji for usage trend."""
-        trend_map = {"up": "⬆️", "down": "⬇️", "stable": "➡️"}
-        return trend_map.get(trend, "➡️")
+        try:
+            return _TREND_EMOJI[trend]
+        except KeyError:
+            return "➡️"
 
     def _get_usage_analytics_section(self, usage: Dict[str, Any]) -> str:
         """Generate usage analytics section."""
@@ -554,48 +664,14 @@ Your current plan provides comprehensive threat modeling. No obvious security th
     def _get_feature_access_section(self, usage: Dict[str, Any]) -> str:
         """Generate feature access summary."""
         plan = usage.get("plan", "free").lower()
-
-        # Create feature list
-        feature_lines = []
-
-        # Always available features
-        feature_lines.append("✅ Basic threat modeling")
-        feature_lines.append("✅ STRIDE methodology")
-
-        # Plan-specific features
-        if plan == "free":
-            feature_lines.append("✅ Simple severity ratings")
-            feature_lines.append("🔒 DREAD scoring (Starter+ feature)")
-            feature_lines.append("🔒 State-of-the-art LLMs (Pro+ feature)")
-            feature_lines.append("🔒 Detailed mitigations (Pro+ feature)")
-            feature_lines.append("🔒 Private repositories (Starter+ feature)")
-        elif plan == "starter":
-            feature_lines.append("✅ DREAD risk scoring")
-            feature_lines.append("✅ Advanced severity analysis")
-            feature_lines.append("✅ Private repositories")
-            feature_lines.append("🔒 State-of-the-art LLMs (Pro+ feature)")
-            feature_lines.append("🔒 Detailed mitigations (Pro+ feature)")
-        elif plan == "pro":
-            feature_lines.append("✅ DREAD risk scoring")
-            feature_lines.append("✅ State-of-the-art LLM access")
-            feature_lines.append("✅ Detailed mitigation steps")
-            feature_lines.append("✅ Private repositories")
-            feature_lines.append("🔒 Custom rules (Enterprise feature)")
-        elif plan == "enterprise":
-            feature_lines.append("✅ All Pro features included")
-            feature_lines.append("✅ Custom volume pricing")
-            feature_lines.append("✅ Dedicated support")
-            feature_lines.append("📞 Contact us for custom requirements")
-
-        features_text = "\n".join([f"- {line}" for line in feature_lines])
-
-        return f"""### 🔓 Feature Access
-{features_text}"""
+        return _FEATURE_ACCESS_SECTIONS.get(plan, _DEFAULT_FEATURE_ACCESS_SECTION)
 
     def _get_account_info_section(self, usage: Dict[str, Any]) -> str:
         """Generate account information section."""
         api_key_created = usage.get("api_key_created")
         last_usage = usage.get("last_usage")
+        if not api_key_created and not last_usage:
+            return _ACCOUNT_ACTIVE_SECTION
 
         lines = []
 
@@ -607,10 +683,6 @@ Your current plan provides comprehensive threat modeling. No obvious security th
             last_used_date = self._format_date(last_usage)
             lines.append(f"- **Last Activity**: {last_used_date}")
 
-        if lines:
-            account_text = "\n".join(lines)
-            return f"""### 👤 Account Details
+        account_text = "\n".join(lines)
+        return f"""### 👤 Account Details
 {account_text}"""
-
-        return """### 👤 Account Details
-- **Account**: Active"""
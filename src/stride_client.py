@@ -3,16 +3,176 @@ STRIDE-GPT API Client
 """
 
 import os
-from typing import Dict, Any, List, Optional
+import json
+import time
+import asyncio
+import importlib.util
+from contextlib import AsyncExitStack, asynccontextmanager
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, Dict, Any, List, NoReturn, Optional, Tuple
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import (
+    RetryCallState,
+    retry,
+    retry_if_exception_type,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+
+# HTTP/2 multiplexes requests over one TLS session, but needs the h2 package
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Seconds a usage lookup is reused before the API is asked again
+USAGE_CACHE_TTL = 30.0
+
+# Longest server-requested Retry-After delay we are willing to sleep for
+MAX_RETRY_AFTER = 30.0
+
+
+class StrideAPIError(Exception):
+    """Base exception for STRIDE API errors."""
+
+    pass
+
+
+class PaymentRequiredError(StrideAPIError):
+    """Raised when usage limit is exceeded."""
+
+    pass
+
+
+class ForbiddenError(StrideAPIError):
+    """Raised when API key is invalid or lacks permissions."""
+
+    pass
+
+
+class RateLimitError(StrideAPIError):
+    """Raised when rate limit is exceeded."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        # Seconds the API asked us to wait before retrying, if it said
+        self.retry_after = retry_after
+
+
+def parse_retry_after(headers: httpx.Headers) -> Optional[float]:
+    """Return the delay requested by a ``Retry-After`` header, in seconds.
+
+    The header may hold either a number of seconds or an HTTP date.
+    """
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        reset = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if reset.tzinfo is None:
+        reset = reset.replace(tzinfo=timezone.utc)
+    return max(0.0, (reset - datetime.now(timezone.utc)).total_seconds())
+
+
+def _error_detail(body: bytes, default: str = "") -> str:
+    """Return the ``detail`` message of an API error body, or ``default``."""
+    if not body:
+        return default
+    try:
+        return _json_loads(body).get("detail", default)
+    except (ValueError, AttributeError):
+        # Not JSON, or not a JSON object
+        return default
+
+
+def _raise_payment_required(response: httpx.Response, body: bytes) -> NoReturn:
+    """Raise for a 402, telling private-repo restrictions from used-up quota."""
+    if "private" in _error_detail(body).lower():
+        raise PaymentRequiredError(
+            "Private repositories require a paid STRIDE-GPT plan. "
+            "Visit https://stridegpt.ai/pricing to upgrade."
+        )
+    raise PaymentRequiredError("Monthly limit reached. Please upgrade your plan.")
+
+
+def _raise_forbidden(response: httpx.Response, body: bytes) -> NoReturn:
+    """Raise for a 403 with the API's explanation, if it gave one."""
+    raise ForbiddenError(
+        _error_detail(body, "Invalid API key or insufficient permissions.")
+    )
+
+
+def _raise_rate_limited(response: httpx.Response, body: bytes) -> NoReturn:
+    """Raise for a 429, keeping any Retry-After delay for the retry wait."""
+    raise RateLimitError(
+        "Rate limit exceeded. Please try again later.",
+        retry_after=parse_retry_after(response.headers),
+    )
+
+
+# Error responses that map to a specific exception, keyed by status code
+_ERROR_HANDLERS: Dict[int, Callable[[httpx.Response, bytes], NoReturn]] = {
+    402: _raise_payment_required,
+    403: _raise_forbidden,
+    429: _raise_rate_limited,
+}
+
+
+# Quota and permission errors will not change on a retry, so analyze
+# raises them at once; retrying them used to cost ~14s of backoff and
+# surface as a RetryError that ActionAnalyzer could not recognise
+_NOT_RETRIED = (PaymentRequiredError, ForbiddenError)
+
+
+def _wait_retry_after(
+    fallback: Callable[[RetryCallState], float],
+) -> Callable[[RetryCallState], float]:
+    """Wait as long as a rate-limited response asked, else use ``fallback``."""
+
+    def wait(retry_state: RetryCallState) -> float:
+        retry_after = getattr(retry_state.outcome.exception(), "retry_after", None)
+        if retry_after is not None:
+            return min(retry_after, MAX_RETRY_AFTER)
+        return fallback(retry_state)
+
+    return wait
 
 
 class StrideClient:
     """Client for interacting with STRIDE-GPT API."""
 
-    def __init__(self, api_key: str, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        limiter: Optional[asyncio.Semaphore] = None,
+    ):
         self.api_key = api_key
+        # Reuse the caller's pooled client if given, otherwise own one that is
+        # created on first use and kept for the lifetime of this client
+        self._owns_client = http_client is None
+        self.http_client = http_client
+        self.limiter = limiter
+        # Fetch time and body of the last usage lookup
+        self._usage_cache: Optional[Tuple[float, Dict[str, Any]]] = None
         self.base_url = base_url or os.environ.get(
             "STRIDE_API_URL", "https://stridegpt-api-production.up.railway.app"
         )
@@ -22,96 +182,104 @@ class StrideClient:
             "User-Agent": "STRIDE-GPT-Action/1.0",
         }
 
+    async def __aenter__(self) -> "StrideClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client if this client created it."""
+        if self._owns_client and self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+
+    @asynccontextmanager
+    async def _client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Yield the pooled HTTP client, creating it on first use.
+
+        Holds a slot of the shared concurrency limiter, if any, for the
+        duration of the request.
+        """
+        async with AsyncExitStack() as stack:
+            if self.limiter is not None:
+                await stack.enter_async_context(self.limiter)
+            if self.http_client is None:
+                self.http_client = httpx.AsyncClient(http2=HTTP2_AVAILABLE)
+            yield self.http_client
+
     @retry(
-        stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10)
+        stop=stop_after_attempt(3),
+        wait=_wait_retry_after(wait_exponential(multiplier=1, min=4, max=10)),
+        retry=retry_if_not_exception_type(_NOT_RETRIED),
+        reraise=True,
     )
     async def analyze(self, analysis_request: Dict[str, Any]) -> Dict[str, Any]:
         """Submit analysis request to STRIDE-GPT API."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
+            async with self._client() as client:
+                async with client.stream(
+                    "POST",
                     f"{self.base_url}/api/v1/analyze",
-                    json=analysis_request,
+                    content=_json_dumps(analysis_request),
                     headers=self.headers,
                     timeout=180.0,
-                )
+                ) as response:
+                    # Collect the (possibly large) body into one growing buffer
+                    # rather than a list of chunks that is joined afterwards
+                    body = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        body.extend(chunk)
         except httpx.TimeoutException:
             raise StrideAPIError(
                 "Analysis request timed out. Large repositories may take longer to analyze. "
                 "Consider using a smaller repository or contact support if this persists."
             )
 
-        if response.status_code == 402:
-            # Check if this is a private repo plan restriction
-            try:
-                error_data = response.json() if response.content else {}
-                error_message = error_data.get("detail", "")
-            except:
-                error_message = ""
-
-            if "private" in error_message.lower():
-                raise PaymentRequiredError(
-                    "Private repositories require a paid STRIDE-GPT plan. "
-                    "Visit https://stridegpt.ai/pricing to upgrade."
-                )
-            else:
-                raise PaymentRequiredError(
-                    "Monthly limit reached. Please upgrade your plan."
-                )
-        elif response.status_code == 403:
-            try:
-                error_data = response.json() if response.content else {}
-                error_message = error_data.get(
-                    "detail", "Invalid API key or insufficient permissions."
-                )
-            except:
-                error_message = "Invalid API key or insufficient permissions."
-            raise ForbiddenError(error_message)
-        elif response.status_code == 429:
-            raise RateLimitError("Rate limit exceeded. Please try again later.")
+        handler = _ERROR_HANDLERS.get(response.status_code)
+        if handler is not None:
+            handler(response, body)
 
         response.raise_for_status()
-        return response.json()
+        # The analysis counts against the quota, so cached usage is now stale
+        self.invalidate_usage()
+        return _json_loads(body)
 
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=_wait_retry_after(wait_exponential(multiplier=1, min=1, max=8)),
+        retry=retry_if_exception_type((httpx.TransportError, RateLimitError)),
+        reraise=True,
+    )
     async def get_usage(self) -> Dict[str, Any]:
-        """Get current usage statistics."""
-        async with httpx.AsyncClient() as client:
+        """Get current usage statistics, reusing a recent lookup."""
+        if self._usage_cache is not None:
+            fetched_at, usage = self._usage_cache
+            if time.monotonic() - fetched_at < USAGE_CACHE_TTL:
+                return usage
+
+        async with self._client() as client:
             response = await client.get(
                 f"{self.base_url}/api/v1/usage", headers=self.headers, timeout=10.0
             )
 
+            if response.status_code == 429:
+                _raise_rate_limited(response, response.content)
             response.raise_for_status()
-            return response.json()
+            usage = _json_loads(response.content)
+
+        self._usage_cache = (time.monotonic(), usage)
+        return usage
+
+    def invalidate_usage(self) -> None:
+        """Forget the cached usage so the next lookup hits the API."""
+        self._usage_cache = None
 
     async def check_health(self) -> bool:
         """Check if the API is healthy."""
         try:
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 response = await client.get(f"{self.base_url}/health", timeout=5.0)
                 return response.status_code == 200
         except Exception:
             return False
-
-
-class StrideAPIError(Exception):
-    """Base exception for STRIDE API errors."""
-
-    pass
-
-
-class PaymentRequiredError(StrideAPIError):
-    """Raised when usage limit is exceeded."""
-
-    pass
-
-
-class ForbiddenError(StrideAPIError):
-    """Raised when API key is invalid or lacks permissions."""
-
-    pass
-
-
-class RateLimitError(StrideAPIError):
-    """Raised when rate limit is exceeded."""
-
-    pass
@@ -2,98 +2,22 @@
 Tests for configuration and environment setup.
 """
 
-import pytest
-import os
-from unittest.mock import patch
-
-
-class TestEnvironmentConfiguration:
-    """Test environment configuration and validation."""
-
-    def test_required_environment_variables(self):
-        """Test that required environment variables are available in tests."""
-        # These should be set by the test fixtures
-        assert "STRIDE_API_KEY" in os.environ or True  # Set by fixtures
-        assert "GITHUB_TOKEN" in os.environ or True  # Set by fixtures
-        assert "GITHUB_REPOSITORY" in os.environ or True  # Set by fixtures
-
-    def test_api_key_validation(self):
-        """Test API key format validation."""
-        valid_keys = [
-            "sk_test_123456789abcdef",
-            "sk_live_abcdef123456789",
-            "sk_dev_999888777666555",
-        ]
-
-        for key in valid_keys:
-            assert key.startswith("sk_")
-            assert len(key) > 10
-
-    def test_github_token_validation(self):
-        """Test GitHub token format validation."""
-        valid_tokens = ["ghp_test123456789abcdef", "gho_example123456789abc"]
-
-        for token in valid_tokens:
-            assert token.startswith(("ghp_", "gho_", "ghr_", "ghs_"))
-            assert len(token) > 10
+import entrypoint
+from src.stride_client import StrideClient
 
 
 class TestConfigurationDefaults:
     """Test configuration defaults and fallbacks."""
 
-    def test_default_api_url(self):
+    def test_default_api_url(self, monkeypatch):
         """Test default API URL configuration."""
-        with patch.dict(os.environ, {}, clear=True):
-            # Default URL should be used when not set
-            default_url = "https://api.stridegpt.ai"
-            assert default_url.startswith("https://")
-
-    def test_trigger_mode_defaults(self):
-        """Test trigger mode configuration."""
-        valid_modes = ["comment", "pr", "manual"]
-
-        for mode in valid_modes:
-            with patch.dict(os.environ, {"TRIGGER_MODE": mode}):
-                assert os.environ.get("TRIGGER_MODE") == mode
-
-    def test_environment_isolation(self):
-        """Test that test environment is properly isolated."""
-        # Ensure we're not accidentally using production values
-        with patch.dict(os.environ, {"ENV": "test"}):
-            assert os.environ.get("ENV") == "test"
-
-
-class TestSecretsHandling:
-    """Test secrets and sensitive data handling."""
-
-    def test_api_key_masking(self):
-        """Test that API keys are properly masked in logs."""
-        api_key = "sk_test_123456789abcdef"
-
-        # Function that would mask the key
-        def mask_secret(secret: str) -> str:
-            if len(secret) > 8:
-                return secret[:3] + "*" * (len(secret) - 6) + secret[-3:]
-            return "*" * len(secret)
+        # Default URL should be used when not set
+        monkeypatch.delenv("STRIDE_API_URL", raising=False)
 
-        masked = mask_secret(api_key)
-        assert masked.startswith("sk_")
-        assert masked.endswith("def")
-        assert "*" in masked
-        assert len(masked) == len(api_key)
+        client = StrideClient("sk_test_123456789abcdef")
 
-    def test_token_validation_patterns(self):
-        """Test token validation patterns."""
-        test_patterns = [
-            ("sk_test_", True),
-            ("sk_live_", True),
-            ("ghp_", True),
-            ("invalid_", False),
-            ("", False),
-        ]
+        assert client.base_url == "https://stridegpt-api-production.up.railway.app"
 
-        for pattern, expected in test_patterns:
-            if expected:
-                assert pattern.startswith(("sk_", "ghp_", "gho_", "ghr_", "ghs_"))
-            else:
-                assert not pattern.startswith(("sk_", "ghp_", "gho_", "ghr_", "ghs_"))
+    def test_trigger_modes(self):
+        """Test that each supported trigger mode has a handler."""
+        assert set(entrypoint.TRIGGER_HANDLERS) == {"comment", "pr", "manual"}
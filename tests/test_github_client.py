@@ -0,0 +1,280 @@
+"""
+Tests for GitHub client functionality.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+import httpx
+
+from src.github_client import GitHubClient
+
+
+def make_client(handler, **kwargs):
+    """Create a GitHub client whose HTTP traffic is served by ``handler``."""
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return GitHubClient(
+        "ghp_test123",
+        "test/repo",
+        api_url="https://api.github.test",
+        http_client=http_client,
+        **kwargs,
+    )
+
+
+def make_file(filename, status="modified", **extra):
+    """Build a PR file entry as returned by the REST API."""
+    return {
+        "filename": filename,
+        "status": status,
+        "additions": 1,
+        "deletions": 0,
+        "changes": 1,
+        "contents_url": "https://api.github.test/contents",
+        **extra,
+    }
+
+
+class TestGitHubClient:
+    """Test the async GitHub REST client."""
+
+    @pytest.mark.asyncio
+    async def test_requests_are_authenticated(self):
+        """Test that requests target the repository with the token."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"private": False})
+
+        client = make_client(handler)
+
+        assert await client.is_public_repo() is True
+        assert str(requests[0].url) == "https://api.github.test/repos/test/repo"
+        assert requests[0].headers["Authorization"] == "Bearer ghp_test123"
+
+    @pytest.mark.asyncio
+    async def test_repo_and_issue_are_fetched_once(self):
+        """Test that repo metadata and issues are memoized per client."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"private": True, "body": "Feature"})
+
+        client = make_client(handler)
+
+        assert await client.is_public_repo() is False
+        assert await client.is_public_repo() is False
+        await client.get_issue(42)
+        assert await client.get_issue_description(42) == "Feature"
+        assert len(requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_create_comment_returns_url(self):
+        """Test that comments are posted to the issue conversation."""
+
+        def handler(request):
+            assert request.method == "POST"
+            assert request.url.path == "/repos/test/repo/issues/42/comments"
+            return httpx.Response(201, json={"html_url": "https://github.com/c/1"})
+
+        client = make_client(handler)
+
+        assert await client.create_comment(42, "Hello") == "https://github.com/c/1"
+
+    @pytest.mark.asyncio
+    async def test_file_content_is_fetched_raw(self):
+        """Test that file contents are requested as raw bytes at a ref."""
+
+        def handler(request):
+            assert request.headers["Accept"] == "application/vnd.github.raw"
+            assert request.url.params["ref"] == "abc123"
+            return httpx.Response(200, content=b"print('hi')\n")
+
+        client = make_client(handler)
+
+        assert await client.get_file_content("app.py", ref="abc123") == (
+            "print('hi')\n"
+        )
+
+    @pytest.mark.asyncio
+    async def test_file_content_path_is_quoted(self):
+        """Test that special characters in a path cannot change the request."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(404)
+
+        client = make_client(handler)
+
+        assert await client.get_file_content("docs/50% #1?.md") == ""
+        assert requests[0].url.raw_path == (
+            b"/repos/test/repo/contents/docs/50%25%20%231%3F.md"
+        )
+
+    @pytest.mark.asyncio
+    async def test_http_errors_are_raised(self):
+        """Test that error responses raise instead of returning bad data."""
+        client = make_client(lambda request: httpx.Response(404))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get_issue_description(42)
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_check_holds_limiter(self):
+        """Test that the rate limit lookup is bounded like every other call."""
+        limiter = asyncio.Semaphore(1)
+        in_flight = []
+
+        def handler(request):
+            in_flight.append(limiter.locked())
+            core = {"remaining": 4999, "limit": 5000, "reset": 0}
+            return httpx.Response(200, json={"resources": {"core": core}})
+
+        client = make_client(handler, limiter=limiter)
+
+        rate_limit = await client.check_rate_limit()
+
+        assert rate_limit["remaining"] == 4999
+        assert in_flight == [True]
+
+    @pytest.mark.asyncio
+    async def test_pr_files_skip_removed_and_paginate(self):
+        """Test that all pages are fetched and removed files are skipped."""
+        pages = {
+            "1": [make_file("src/removed.py", "removed"), make_file("src/a.py")],
+            "2": [make_file("src/b.py")],
+            "3": [make_file("src/c.py", patch="@@ -1 +1 @@")],
+        }
+
+        def handler(request):
+            page = request.url.params["page"]
+            headers = {}
+            if page == "1":
+                headers["link"] = (
+                    '<https://api.github.test/x?per_page=100&page=2>; rel="next", '
+                    '<https://api.github.test/x?per_page=100&page=3>; rel="last"'
+                )
+            return httpx.Response(200, json=pages[page], headers=headers)
+
+        client = make_client(handler)
+        files = await client.get_pr_files(42)
+
+        assert [f["filename"] for f in files] == ["src/a.py", "src/b.py", "src/c.py"]
+        assert files[0]["patch"] is None
+        assert files[-1]["patch"] == "@@ -1 +1 @@"
+
+    @pytest.mark.asyncio
+    async def test_has_pr_files_stops_at_first_page(self):
+        """Test that checking for PR files does not fetch later pages."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(
+                200,
+                json=[make_file("src/a.py")],
+                headers={
+                    "link": '<https://api.github.test/x?per_page=100&page=5>; rel="last"'
+                },
+            )
+
+        client = make_client(handler)
+
+        assert await client.has_pr_files(42) is True
+        assert len(requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_has_pr_files_ignores_removed(self):
+        """Test that a PR only removing files has nothing to analyze."""
+
+        def handler(request):
+            return httpx.Response(200, json=[make_file("src/old.py", "removed")])
+
+        client = make_client(handler)
+
+        assert await client.has_pr_files(42) is False
+
+
+class TestRetries:
+    """Test retrying of throttled and transient GitHub responses."""
+
+    @pytest.fixture
+    def no_retry_sleep(self, monkeypatch):
+        """Make retry backoff instant, recording the waits it asked for."""
+        sleep = AsyncMock()
+        monkeypatch.setattr(GitHubClient._send.retry, "sleep", sleep)
+        return sleep
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_request_is_retried(self):
+        """Test that a 429 with Retry-After is retried once the wait is over."""
+        responses = [
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(200, json={"body": "Feature"}),
+        ]
+        client = make_client(lambda request: responses.pop(0))
+
+        assert await client.get_issue_description(42) == "Feature"
+        assert responses == []
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "first, wait",
+        [
+            (httpx.Response(403, headers={"Retry-After": "60"}), 30.0),
+            (httpx.Response(403, headers={"x-ratelimit-remaining": "0"}), 1.0),
+            (httpx.Response(502), 1.0),
+        ],
+        ids=["secondary-limit", "primary-limit", "server-error"],
+    )
+    async def test_transient_responses_are_retried(self, first, wait, no_retry_sleep):
+        """Test that throttling and server errors back off, capped, and retry."""
+        responses = [first, httpx.Response(200, json={"body": "Feature"})]
+        client = make_client(lambda request: responses.pop(0))
+
+        assert await client.get_issue_description(42) == "Feature"
+        no_retry_sleep.assert_awaited_once_with(wait)
+
+    @pytest.mark.asyncio
+    async def test_backoff_holds_limiter_slot(self, no_retry_sleep):
+        """Test that a throttled request keeps its slot while it waits."""
+        limiter = asyncio.Semaphore(1)
+        held = []
+        no_retry_sleep.side_effect = lambda seconds: held.append(limiter.locked())
+        responses = [
+            httpx.Response(429, headers={"Retry-After": "5"}),
+            httpx.Response(200, json={"body": "Feature"}),
+        ]
+        client = make_client(lambda request: responses.pop(0), limiter=limiter)
+
+        assert await client.get_issue_description(42) == "Feature"
+        assert held == [True]
+        assert not limiter.locked()
+
+    @pytest.mark.asyncio
+    async def test_forbidden_is_not_retried(self, no_retry_sleep):
+        """Test that a 403 without rate-limit headers fails at once."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(403)
+
+        client = make_client(handler)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get_issue_description(42)
+        assert len(requests) == 1
+        no_retry_sleep.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_persistent_server_error_is_raised(self, no_retry_sleep):
+        """Test that the last error is raised once retries run out."""
+        client = make_client(lambda request: httpx.Response(503))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get_issue_description(42)
+        assert no_retry_sleep.await_count == 2
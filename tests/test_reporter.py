@@ -0,0 +1,145 @@
+"""
+Tests for comment reporter functionality.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from src.analyzer import AnalysisResult
+from src.reporter import CommentReporter
+
+
+class TestCommentReporter:
+    """Test the CommentReporter class."""
+
+    @pytest.fixture
+    def reporter(self, mock_github_client, mock_stride_client):
+        """Create a reporter with mocked clients."""
+        return CommentReporter(mock_github_client, mock_stride_client)
+
+    @pytest.mark.asyncio
+    async def test_threats_comment_fetches_usage_once(
+        self, reporter, mock_github_client, mock_stride_client
+    ):
+        """Test that the plan header and footer share one usage lookup."""
+        result = AnalysisResult(
+            threat_count=1,
+            threats=[{"title": "SQL Injection", "severity": "HIGH"}],
+            analysis_id="ana_test123",
+            usage_info={},
+        )
+
+        await reporter.post_analysis_comment(42, result)
+
+        mock_stride_client.get_usage.assert_awaited_once()
+        body = mock_github_client.create_comment.call_args[0][1]
+        assert "(Free Tier)" in body
+        assert "#### 🔴 HIGH: SQL Injection" in body
+        assert "You've used 5 of 50 free analyses this month" in body
+
+    @pytest.mark.asyncio
+    async def test_threats_sorted_by_severity(self, reporter, mock_github_client):
+        """Test that threats are listed most severe first and counted."""
+        result = AnalysisResult(
+            threat_count=4,
+            threats=[
+                {"title": "A", "severity": "low"},
+                {"title": "B", "severity": "Critical"},
+                {"title": "C", "severity": "odd"},
+                {"title": "D"},
+            ],
+            analysis_id="ana_test123",
+            usage_info={"plan": "pro"},
+        )
+
+        await reporter.post_analysis_comment(42, result)
+
+        body = mock_github_client.create_comment.call_args[0][1]
+        headers = [line for line in body.splitlines() if line.startswith("#### ")]
+        assert headers == [
+            "#### 🚨 CRITICAL: B",
+            "#### 🟡 ODD: C",
+            "#### 🟡 MEDIUM: D",
+            "#### 🟢 LOW: A",
+        ]
+        assert "1 Critical, 0 High, 1 Medium, 1 Low" in body
+
+    @pytest.mark.asyncio
+    async def test_usage_failure_falls_back_to_result(
+        self, reporter, mock_github_client, mock_stride_client, mock_analysis_result
+    ):
+        """Test that a failed usage lookup does not block the comment."""
+        mock_stride_client.get_usage.side_effect = Exception("API down")
+        mock_analysis_result.threat_count = 0
+        mock_analysis_result.threats = []
+
+        await reporter.post_analysis_comment(42, mock_analysis_result)
+
+        body = mock_github_client.create_comment.call_args[0][1]
+        assert "No Security Threats Detected" in body
+        assert "You've used 0 of 20 free analyses this month" in body
+
+    @pytest.mark.asyncio
+    async def test_limit_reached_skips_usage_lookup(
+        self,
+        reporter,
+        mock_github_client,
+        mock_stride_client,
+        mock_limited_analysis_result,
+    ):
+        """Test that the limit-reached comment needs no usage data."""
+        await reporter.post_analysis_comment(42, mock_limited_analysis_result)
+
+        mock_stride_client.get_usage.assert_not_called()
+        body = mock_github_client.create_comment.call_args[0][1]
+        assert body.startswith("## 🛑 Monthly Analysis Limit Reached")
+
+    @pytest.mark.asyncio
+    async def test_status_comment_skips_empty_sections(
+        self, reporter, mock_github_client
+    ):
+        """Test that sections without data leave no blank gaps."""
+        usage = {"plan": "pro", "analyses_used": 5, "analyses_limit": 2500}
+
+        await reporter.post_status_comment(42, usage)
+
+        body = mock_github_client.create_comment.call_args[0][1]
+        assert "- **Remaining**: 2495" in body
+        assert "Usage Analytics" not in body
+        assert "- **Account**: Active" in body
+        assert "\n\n\n" not in body
+
+
+class TestDateFormatting:
+    """Test the date helpers used by the status comment."""
+
+    def test_format_date(self, mock_github_client):
+        """Test that ISO timestamps are shown as readable dates."""
+        reporter = CommentReporter(mock_github_client)
+
+        assert reporter._format_date("2024-01-31T00:00:00Z") == "Jan 31, 2024"
+        assert reporter._format_date("2024-01-31T00:00:00") == "Jan 31, 2024"
+        assert reporter._format_date("2024-01-31T10:00:00.5Z") == "Jan 31, 2024"
+        assert reporter._format_date("not a date") == "not a date"
+        assert reporter._format_date(None) == "N/A"
+
+    def test_calculate_days_remaining(self, mock_github_client):
+        """Test the days remaining in the billing period."""
+        reporter = CommentReporter(mock_github_client)
+
+        assert reporter._calculate_days_remaining("2000-01-01T00:00:00Z") == (
+            "Period ended"
+        )
+        assert reporter._calculate_days_remaining("garbage") == "Unknown"
+        assert reporter._calculate_days_remaining("N/A") == "N/A"
+
+    def test_days_remaining_uses_given_now(self, mock_github_client):
+        """Test that a caller-supplied clock reading is honoured."""
+        reporter = CommentReporter(mock_github_client)
+        period_end = "2024-01-31T00:00:00Z"
+
+        now = datetime(2024, 1, 21, tzinfo=timezone.utc)
+        assert reporter._calculate_days_remaining(period_end, now=now) == "10 days"
+        now = datetime(2024, 1, 30, 12, tzinfo=timezone.utc)
+        assert reporter._calculate_days_remaining(period_end, now=now) == "Last day"
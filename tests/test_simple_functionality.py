@@ -3,89 +3,347 @@ Simple functionality tests that avoid complex mocking issues.
 """
 
 import pytest
-from unittest.mock import Mock, AsyncMock
+from unittest.mock import Mock, AsyncMock, patch
 
-from src.analyzer import ActionAnalyzer, AnalysisResult
+from src.analyzer import ActionAnalyzer
 from src.github_client import GitHubClient
 from src.stride_client import StrideClient
 import entrypoint
 
 
-class TestBasicFunctionality:
-    """Test basic functionality without complex mocking."""
+class TestCommandParsing:
+    """Test command parsing functionality."""
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("@stride-gpt analyze", "analyze"),
+            ("@stride-gpt help", "help"),
+            ("@stride-gpt status", "status"),
+            ("Please @stride-gpt analyze this PR", "analyze"),
+            # Just mentioning @stride-gpt defaults to analyze
+            ("Hey @stride-gpt, can you check this", "analyze"),
+            ("@STRIDE-GPT HELP", "help"),
+            ("This is just a regular comment", None),
+            ("@stride-gpt unknown", "unknown"),
+        ],
+        ids=[
+            "analyze",
+            "help",
+            "status",
+            "text-before-mention",
+            "mention-only",
+            "case-insensitive",
+            "no-mention",
+            "unknown",
+        ],
+    )
+    def test_parse_command(self, text, expected):
+        """Test parsing commands out of comment text."""
+        assert entrypoint.parse_command(text) == expected
+
+
+class TestMainFunction:
+    """Test the action entry point."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "var, expected_msg",
+        [
+            (
+                "STRIDE_API_KEY",
+                "::error::STRIDE_API_KEY is required. "
+                "Get your free key at https://stridegpt.ai",
+            ),
+            ("GITHUB_TOKEN", "::error::GITHUB_TOKEN is required"),
+            (
+                "GITHUB_REPOSITORY",
+                "::error::GITHUB_REPOSITORY not found in environment",
+            ),
+        ],
+    )
+    async def test_main_missing_config(
+        self, var, expected_msg, mock_env_vars, mock_github_context, monkeypatch, capsys
+    ):
+        """Test that missing required configuration fails with an annotation."""
+        monkeypatch.setenv(var, "")
+
+        with pytest.raises(SystemExit) as exc_info:
+            await entrypoint.main(mock_github_context)
+
+        assert exc_info.value.code == 1
+        assert expected_msg in capsys.readouterr().out
+
+    @pytest.mark.asyncio
+    async def test_main_rejects_non_integer_concurrency(
+        self, mock_env_vars, mock_github_context, monkeypatch, capsys
+    ):
+        """Test that a malformed concurrency limit fails with its own error."""
+        monkeypatch.setenv("STRIDE_GH_CONCURRENCY", "ten")
+
+        with pytest.raises(SystemExit) as exc_info:
+            await entrypoint.main(mock_github_context)
+
+        assert exc_info.value.code == 1
+        assert (
+            "::error::STRIDE_GH_CONCURRENCY must be an integer"
+            in capsys.readouterr().out
+        )
+
+    @pytest.mark.asyncio
+    async def test_main_clamps_zero_concurrency(
+        self,
+        mock_env_vars,
+        mock_github_context,
+        mock_github_client,
+        mock_stride_client,
+        monkeypatch,
+    ):
+        """Test that a zero concurrency limit still lets requests through."""
+        monkeypatch.setenv("STRIDE_GH_CONCURRENCY", "0")
+        mock_github_context["event"]["comment"]["body"] = "@stride-gpt status"
+
+        with patch(
+            "src.github_client.GitHubClient", return_value=mock_github_client
+        ) as mock_github_class, patch(
+            "src.stride_client.StrideClient", return_value=mock_stride_client
+        ):
+            await entrypoint.main(mock_github_context)
+
+        limiter = mock_github_class.call_args.kwargs["limiter"]
+        assert not limiter.locked()
+
+    @pytest.mark.asyncio
+    async def test_main_skips_comment_without_mention(
+        self, mock_env_vars, mock_github_context
+    ):
+        """Test that unrelated comments exit before any client is created."""
+        mock_github_context["event"]["comment"]["body"] = "Looks good to me"
+
+        with patch("src.github_client.GitHubClient") as mock_github_class:
+            with pytest.raises(SystemExit) as exc_info:
+                await entrypoint.main(mock_github_context)
+
+        assert exc_info.value.code == 0
+        mock_github_class.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_main_status_posts_usage(
+        self, mock_env_vars, mock_github_context, mock_github_client, mock_stride_client
+    ):
+        """Test that the status command posts current usage on the issue."""
+        mock_github_context["event"]["comment"]["body"] = "@stride-gpt status"
 
-    def test_analysis_result_creation(self):
-        """Test creating an AnalysisResult."""
-        result = AnalysisResult(
-            threat_count=1,
-            threats=[{"id": "test"}],
-            analysis_id="ana_123",
-            usage_info={"plan": "FREE"},
+        with patch(
+            "src.github_client.GitHubClient", return_value=mock_github_client
+        ), patch("src.stride_client.StrideClient", return_value=mock_stride_client):
+            await entrypoint.main(mock_github_context)
+
+        mock_stride_client.get_usage.assert_awaited_once()
+        mock_github_client.create_comment.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_main_pr_trigger_posts_results(
+        self,
+        mock_env_vars,
+        mock_pr_context,
+        mock_github_client,
+        mock_stride_client,
+        tmp_path,
+        monkeypatch,
+    ):
+        """Test that the PR trigger comments on the PR and sets outputs."""
+        output_file = tmp_path / "output"
+        monkeypatch.setenv("GITHUB_OUTPUT", str(output_file))
+        monkeypatch.setenv("TRIGGER_MODE", "pr")
+
+        with patch(
+            "src.github_client.GitHubClient", return_value=mock_github_client
+        ), patch("src.stride_client.StrideClient", return_value=mock_stride_client):
+            await entrypoint.main(mock_pr_context)
+
+        mock_github_client.create_comment.assert_called_once()
+        assert output_file.read_text() == (
+            "threat-count=1\n"
+            "report-url=https://github.com/test/repo/issues/42#issuecomment-123456\n"
         )
 
-        assert result.threat_count == 1
-        assert len(result.threats) == 1
-        assert result.analysis_id == "ana_123"
-        assert result.is_limited is False
-        assert result.upgrade_message is None
-
-    def test_analysis_result_with_limits(self):
-        """Test AnalysisResult with limitations."""
-        result = AnalysisResult(
-            threat_count=0,
-            threats=[],
-            analysis_id="",
-            usage_info={"limit_reached": True},
-            is_limited=True,
-            upgrade_message="Upgrade required",
+    @pytest.mark.asyncio
+    async def test_main_reports_failure_with_traceback(
+        self, mock_env_vars, mock_github_context, capsys
+    ):
+        """Test that failures emit an error annotation and a traceback group."""
+        with patch("src.github_client.GitHubClient", side_effect=RuntimeError("boom")):
+            with pytest.raises(SystemExit) as exc_info:
+                await entrypoint.main(mock_github_context)
+
+        output = capsys.readouterr().out
+        assert exc_info.value.code == 1
+        assert (
+            "::error title=STRIDE-GPT failure::Action failed: RuntimeError: boom"
+            in output
         )
+        assert "::group::Traceback" in output
+
+
+class TestGitHubContext:
+    """Test loading the GitHub context."""
+
+    def test_event_file_preferred_over_context_env(self, tmp_path, monkeypatch):
+        """Test that the event file is read directly when available."""
+        event_file = tmp_path / "event.json"
+        event_file.write_text('{"issue": {"number": 7}}')
+        monkeypatch.setenv("GITHUB_EVENT_PATH", str(event_file))
+        monkeypatch.setenv("GITHUB_EVENT_NAME", "issue_comment")
+        monkeypatch.setenv("GITHUB_CONTEXT", '{"event_name": "stale"}')
+
+        context = entrypoint.load_github_context()
+
+        assert context["event_name"] == "issue_comment"
+        assert context["event"] == {"issue": {"number": 7}}
+
+    def test_context_env_fallback(self, monkeypatch):
+        """Test that GITHUB_CONTEXT is used when there is no event file."""
+        monkeypatch.delenv("GITHUB_EVENT_PATH", raising=False)
+        monkeypatch.setenv("GITHUB_CONTEXT", '{"event_name": "pull_request"}')
+
+        assert entrypoint.load_github_context() == {"event_name": "pull_request"}
+
+    def test_extract_event_fields(self):
+        """Test that only the used webhook fields are kept."""
+        context = {
+            "event_name": "issue_comment",
+            "repository": "test/repo",
+            "event": {
+                "comment": {"body": "@stride-gpt help", "user": {"login": "a"}},
+                "issue": {"number": 7, "pull_request": {"url": "https://x"}},
+            },
+        }
+
+        assert entrypoint.extract_event_fields(context) == {
+            "event_name": "issue_comment",
+            "comment_body": "@stride-gpt help",
+            "issue_number": 7,
+            "is_pull_request": True,
+            "pr_number": None,
+        }
+
+
+class TestManualReport:
+    """Test manual-mode log formatting."""
+
+    def test_format_manual_report(self, mock_analysis_result):
+        """Test that the report is a single grouped log block."""
+        report = entrypoint.format_manual_report("test/repo", mock_analysis_result)
+
+        assert report.startswith("::group::STRIDE-GPT Security Analysis Results\n")
+        assert report.endswith("::endgroup::\n")
+        assert "Repository: test/repo" in report
+        assert "Threats found: 2" in report
+        assert "--- Threat 2 ---" in report
+        assert "Title: Sensitive Data Exposure" in report
+
+    def test_format_manual_summary(self, mock_analysis_result):
+        """Test that the job summary renders each threat as Markdown."""
+        summary = entrypoint.format_manual_summary("test/repo", mock_analysis_result)
+
+        assert summary.startswith("## 🛡️ STRIDE GPT Security Analysis Results\n")
+        assert "- **Threats Found**: 2" in summary
+        assert "### Threat 1: SQL Injection" in summary
+        assert "- **Severity**: MEDIUM" in summary
+
+    def test_format_manual_summary_omits_input_prompt(self, mock_analysis_result):
+        """Test that the debugging prompt stays out of the size-limited summary."""
+        mock_analysis_result.usage_info = {"input_prompt": "PROMPT " * 1000}
+
+        summary = entrypoint.format_manual_summary("test/repo", mock_analysis_result)
+
+        assert "PROMPT" not in summary
+
+    def test_report_manual_results_writes_summary(
+        self, mock_analysis_result, tmp_path, monkeypatch, capsys
+    ):
+        """Test that results go to the job summary when it is writable."""
+        summary_file = tmp_path / "summary.md"
+        output_file = tmp_path / "output"
+        monkeypatch.setenv("GITHUB_STEP_SUMMARY", str(summary_file))
+        monkeypatch.setenv("GITHUB_OUTPUT", str(output_file))
+
+        entrypoint.report_manual_results("test/repo", mock_analysis_result)
+
+        assert "### Threat 1: SQL Injection" in summary_file.read_text()
+        assert output_file.read_text() == "threat-count=2\n"
+        assert "::group::" not in capsys.readouterr().out
+
+    def test_report_manual_results_falls_back_to_log(
+        self, mock_analysis_result, tmp_path, monkeypatch, capsys
+    ):
+        """Test that unwritable runner files do not lose the results."""
+        monkeypatch.setenv("GITHUB_STEP_SUMMARY", str(tmp_path / "missing" / "s.md"))
+        monkeypatch.setenv("GITHUB_OUTPUT", str(tmp_path / "missing" / "output"))
+
+        entrypoint.report_manual_results("test/repo", mock_analysis_result)
+
+        output = capsys.readouterr().out
+        assert "::group::STRIDE-GPT Security Analysis Results" in output
+        assert "Title: Sensitive Data Exposure" in output
+        assert "::set-output name=threat-count::2" in output
 
-        assert result.is_limited is True
-        assert result.upgrade_message == "Upgrade required"
+    @pytest.mark.asyncio
+    async def test_handle_manual_reports_repository_analysis(
+        self, mock_github_client, mock_analysis_result, monkeypatch, capsys
+    ):
+        """Test that the manual trigger analyzes the repository and reports it."""
+        monkeypatch.delenv("GITHUB_STEP_SUMMARY", raising=False)
+        monkeypatch.delenv("GITHUB_OUTPUT", raising=False)
+        analyzer = Mock(spec=ActionAnalyzer)
+        analyzer.analyze_repository = AsyncMock(return_value=mock_analysis_result)
 
+        await entrypoint._handle_manual({}, mock_github_client, None, analyzer, None)
+
+        analyzer.analyze_repository.assert_awaited_once()
+        output = capsys.readouterr().out
+        assert "Repository: test/repo" in output
+        assert "::set-output name=threat-count::2" in output
 
-class TestCommandParsing:
-    """Test command parsing functionality."""
 
-    def test_parse_analyze_command(self):
-        """Test parsing analyze command."""
-        command = entrypoint.parse_command("@stride-gpt analyze")
-        assert command == "analyze"
+class TestAnnotations:
+    """Test workflow command annotations."""
 
-    def test_parse_help_command(self):
-        """Test parsing help command."""
-        command = entrypoint.parse_command("@stride-gpt help")
-        assert command == "help"
+    def test_error_escapes_message_and_title(self, capsys):
+        """Test that newlines and percents cannot break the error command."""
+        entrypoint._error("100% failed\r\nsee: logs", title="STRIDE-GPT: a, b")
+
+        assert capsys.readouterr().out == (
+            "::error title=STRIDE-GPT%3A a%2C b::100%25 failed%0D%0Asee: logs\n"
+        )
+
+    def test_notice_escapes_message(self, capsys):
+        """Test that a multi-line notice stays a single command."""
+        entrypoint._notice("line one\nline two")
+
+        assert capsys.readouterr().out == "::notice::line one%0Aline two\n"
 
-    def test_parse_status_command(self):
-        """Test parsing status command."""
-        command = entrypoint.parse_command("@stride-gpt status")
-        assert command == "status"
 
-    def test_parse_command_with_text_before(self):
-        """Test parsing command with text before mention."""
-        command = entrypoint.parse_command("Please @stride-gpt analyze this PR")
-        assert command == "analyze"
+class TestOutputs:
+    """Test action output emission."""
 
-    def test_parse_command_just_mention(self):
-        """Test that just mentioning @stride-gpt defaults to analyze."""
-        command = entrypoint.parse_command("Hey @stride-gpt, can you check this")
-        assert command == "analyze"
+    def test_set_outputs_writes_github_output(self, tmp_path, monkeypatch):
+        """Test that outputs are appended to the GITHUB_OUTPUT file."""
+        output_file = tmp_path / "output"
+        monkeypatch.setenv("GITHUB_OUTPUT", str(output_file))
 
-    def test_parse_command_case_insensitive(self):
-        """Test that command parsing is case insensitive."""
-        command = entrypoint.parse_command("@STRIDE-GPT HELP")
-        assert command == "help"
+        entrypoint.set_outputs({"threat-count": 3, "report-url": "https://x"})
 
-    def test_parse_command_no_mention(self):
-        """Test parsing when @stride-gpt is not mentioned."""
-        command = entrypoint.parse_command("This is just a regular comment")
-        assert command is None
+        assert output_file.read_text() == "threat-count=3\nreport-url=https://x\n"
 
-    def test_parse_unknown_command(self):
-        """Test parsing unknown command."""
-        command = entrypoint.parse_command("@stride-gpt unknown")
-        assert command == "unknown"
+    def test_set_outputs_legacy_fallback(self, monkeypatch, capsys):
+        """Test legacy set-output commands when GITHUB_OUTPUT is not set."""
+        monkeypatch.delenv("GITHUB_OUTPUT", raising=False)
+
+        entrypoint.set_outputs({"threat-count": 0})
+
+        assert "::set-output name=threat-count::0" in capsys.readouterr().out
 
 
 class TestAnalyzerWithMocks:
@@ -109,7 +367,7 @@ class TestAnalyzerWithMocks:
 
         # Mock empty file list
         github_client.is_public_repo.return_value = True
-        github_client.get_pr_files.return_value = []
+        github_client.has_pr_files.return_value = False
 
         analyzer = ActionAnalyzer(github_client, stride_client)
         result = await analyzer.analyze_pr(42)
@@ -138,32 +396,3 @@ class TestAnalyzerWithMocks:
 
         # Should not call stride client for empty description
         stride_client.analyze.assert_not_called()
-
-
-class TestConfigValidation:
-    """Test configuration validation helpers."""
-
-    def test_api_key_formats(self):
-        """Test API key format validation."""
-        valid_keys = [
-            "sk_test_123456789abcdef",
-            "sk_live_abcdef123456789",
-            "sk_dev_999888777666555",
-        ]
-
-        for key in valid_keys:
-            assert key.startswith("sk_")
-            assert len(key) > 10
-
-    def test_github_token_formats(self):
-        """Test GitHub token format validation."""
-        valid_tokens = [
-            "ghp_test123456789abcdef",
-            "gho_example123456789abc",
-            "ghr_test123456789abcdef",
-            "ghs_test123456789abcdef",
-        ]
-
-        for token in valid_tokens:
-            assert token.startswith(("ghp_", "gho_", "ghr_", "ghs_"))
-            assert len(token) > 10
@@ -2,163 +2,341 @@
 Simple tests for STRIDE client functionality.
 """
 
+import asyncio
+import json
 import pytest
-from unittest.mock import Mock, AsyncMock, patch
+from unittest.mock import AsyncMock, patch
 import httpx
 
+from src.analyzer import ActionAnalyzer
 from src.stride_client import (
+    HTTP2_AVAILABLE,
     StrideClient,
     StrideAPIError,
+    _ERROR_HANDLERS,
+    _error_detail,
+    parse_retry_after,
     PaymentRequiredError,
     ForbiddenError,
     RateLimitError,
 )
 
+# Request and response bodies shared by the tests; the client never mutates them
+ANALYSIS_REQUEST = {"repository": "test/repo"}
+ANALYSIS_RESPONSE = {"analysis_id": "ana_test123", "status": "completed", "threats": []}
+USAGE_RESPONSE = {"plan": "FREE", "analyses_used": 5, "analyses_limit": 50}
+
+
+def make_client(handler, **kwargs):
+    """Build a client whose requests are answered by ``handler``."""
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return StrideClient(
+        "sk_test_123", "https://api.test.com", http_client=http_client, **kwargs
+    )
+
+
+@pytest.fixture
+def no_retry_sleep(monkeypatch):
+    """Make retry backoff instant, recording the waits it asked for."""
+    sleep = AsyncMock()
+    monkeypatch.setattr(StrideClient.analyze.retry, "sleep", sleep)
+    monkeypatch.setattr(StrideClient.get_usage.retry, "sleep", sleep)
+    return sleep
+
 
 class TestStrideClientBasics:
     """Test basic STRIDE client functionality."""
 
-    def test_client_initialization(self):
-        """Test client initialization."""
-        client = StrideClient("sk_test_123", "https://api.test.com")
+    @pytest.mark.parametrize(
+        "env_url, base_url, expected",
+        [
+            (None, "https://api.test.com", "https://api.test.com"),
+            ("https://custom.api.com", None, "https://custom.api.com"),
+            ("https://custom.api.com", "https://api.test.com", "https://api.test.com"),
+        ],
+        ids=["explicit", "from-env", "explicit-over-env"],
+    )
+    def test_client_initialization(self, env_url, base_url, expected, monkeypatch):
+        """Test that the API URL comes from the argument, then the environment."""
+        if env_url is None:
+            monkeypatch.delenv("STRIDE_API_URL", raising=False)
+        else:
+            monkeypatch.setenv("STRIDE_API_URL", env_url)
+
+        client = StrideClient("sk_test_123", base_url)
+
         assert client.api_key == "sk_test_123"
-        assert client.base_url == "https://api.test.com"
+        assert client.base_url == expected
         assert client.headers["Authorization"] == "Bearer sk_test_123"
         assert client.headers["User-Agent"] == "STRIDE-GPT-Action/1.0"
 
-    def test_client_default_url(self):
-        """Test client with default URL."""
-        with patch.dict("os.environ", {"STRIDE_API_URL": "https://custom.api.com"}):
-            client = StrideClient("sk_test_123")
-            assert client.base_url == "https://custom.api.com"
-
     @pytest.mark.asyncio
     async def test_analyze_success(self):
         """Test successful analysis request."""
-        client = StrideClient("sk_test_123", "https://api.test.com")
+        response = httpx.Response(200, json=ANALYSIS_RESPONSE)
+        client = make_client(lambda request: response)
 
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "analysis_id": "ana_test123",
-            "status": "completed",
-            "threats": [],
-        }
-        mock_response.raise_for_status.return_value = None
+        result = await client.analyze(ANALYSIS_REQUEST)
 
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.post.return_value = mock_response
-            mock_client_class.return_value = mock_client
-
-            result = await client.analyze({"repository": "test/repo"})
-
-            assert result["analysis_id"] == "ana_test123"
-            assert result["status"] == "completed"
+        assert result["analysis_id"] == "ana_test123"
+        assert result["status"] == "completed"
 
     @pytest.mark.asyncio
     async def test_get_usage_success(self):
         """Test successful usage retrieval."""
-        client = StrideClient("sk_test_123", "https://api.test.com")
+        response = httpx.Response(200, json=USAGE_RESPONSE)
+        client = make_client(lambda request: response)
+
+        result = await client.get_usage()
+
+        assert result["plan"] == "FREE"
+        assert result["analyses_used"] == 5
+
+    @pytest.mark.asyncio
+    async def test_shared_http_client_is_reused(self):
+        """Test that an injected HTTP client is used instead of a new one."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json=USAGE_RESPONSE)
 
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "plan": "FREE",
-            "analyses_used": 5,
-            "analyses_limit": 50,
-        }
-        mock_response.raise_for_status.return_value = None
+        client = make_client(handler)
 
         with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.get.return_value = mock_response
-            mock_client_class.return_value = mock_client
+            await client.get_usage()
+            await client.check_health()
+
+            mock_client_class.assert_not_called()
+        assert len(requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_usage_is_cached_until_analysis(self):
+        """Test that usage is reused until an analysis changes the counts."""
+        usage_requests = []
+
+        def handler(request):
+            if request.url.path == "/api/v1/usage":
+                usage_requests.append(request)
+                return httpx.Response(200, json=USAGE_RESPONSE)
+            return httpx.Response(200, json=ANALYSIS_RESPONSE)
+
+        client = make_client(handler)
 
-            result = await client.get_usage()
+        assert await client.get_usage() == USAGE_RESPONSE
+        await client.get_usage()
+        assert len(usage_requests) == 1
 
-            assert result["plan"] == "FREE"
-            assert result["analyses_used"] == 5
+        await client.analyze(ANALYSIS_REQUEST)
+        await client.get_usage()
+        assert len(usage_requests) == 2
 
     @pytest.mark.asyncio
-    async def test_check_health_success(self):
-        """Test successful health check."""
-        client = StrideClient("sk_test_123", "https://api.test.com")
+    async def test_owned_http_client_is_pooled_and_closed(self):
+        """Test that one owned HTTP client serves every call until closed."""
+        requests = []
 
-        mock_response = Mock()
-        mock_response.status_code = 200
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json=USAGE_RESPONSE)
 
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client = AsyncMock()
-            mock_client.__aenter__.return_value = mock_client
-            mock_client.__aexit__.return_value = None
-            mock_client.get.return_value = mock_response
-            mock_client_class.return_value = mock_client
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        with patch("httpx.AsyncClient", return_value=http_client) as mock_client_class:
+            async with StrideClient("sk_test_123", "https://api.test.com") as client:
+                await client.get_usage()
+                assert await client.check_health() is True
+
+            mock_client_class.assert_called_once_with(http2=HTTP2_AVAILABLE)
+        assert len(requests) == 2
+        assert http_client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_limiter_bounds_concurrent_requests(self):
+        """Test that requests hold a slot of the shared limiter."""
+        limiter = asyncio.Semaphore(1)
+        in_flight = []
+
+        def handler(request):
+            in_flight.append(limiter.locked())
+            return httpx.Response(200)
 
-            result = await client.check_health()
+        client = make_client(handler, limiter=limiter)
 
-            assert result is True
+        await asyncio.gather(client.check_health(), client.check_health())
+
+        assert in_flight == [True, True]
+        assert not limiter.locked()
+
+    @pytest.mark.asyncio
+    async def test_check_health_success(self):
+        """Test successful health check."""
+        client = make_client(lambda request: httpx.Response(200))
+
+        assert await client.check_health() is True
 
     @pytest.mark.asyncio
     async def test_check_health_failure(self):
         """Test health check failure."""
-        client = StrideClient("sk_test_123", "https://api.test.com")
 
-        with patch("httpx.AsyncClient") as mock_client_class:
-            mock_client_class.side_effect = Exception("Connection failed")
+        def handler(request):
+            raise httpx.ConnectError("Connection failed", request=request)
 
-            result = await client.check_health()
+        client = make_client(handler)
 
-            assert result is False
+        assert await client.check_health() is False
 
 
 class TestStrideAPIErrors:
     """Test STRIDE API error classes."""
 
-    def test_base_error(self):
-        """Test base StrideAPIError."""
-        error = StrideAPIError("Test error")
-        assert str(error) == "Test error"
+    @pytest.mark.parametrize(
+        "error_class, message",
+        [
+            (StrideAPIError, "Test error"),
+            (PaymentRequiredError, "Limit reached"),
+            (ForbiddenError, "Invalid key"),
+            (RateLimitError, "Too many requests"),
+        ],
+    )
+    def test_error_classes(self, error_class, message):
+        """Test that each error keeps its message and shares the base class."""
+        error = error_class(message)
+        assert str(error) == message
+        assert isinstance(error, StrideAPIError)
         assert isinstance(error, Exception)
 
-    def test_payment_required_error(self):
-        """Test PaymentRequiredError."""
-        error = PaymentRequiredError("Limit reached")
-        assert str(error) == "Limit reached"
-        assert isinstance(error, StrideAPIError)
 
-    def test_forbidden_error(self):
-        """Test ForbiddenError."""
-        error = ForbiddenError("Invalid key")
-        assert str(error) == "Invalid key"
-        assert isinstance(error, StrideAPIError)
+class TestErrorHandling:
+    """Test error handling in client."""
 
-    def test_rate_limit_error(self):
-        """Test RateLimitError."""
-        error = RateLimitError("Too many requests")
-        assert str(error) == "Too many requests"
-        assert isinstance(error, StrideAPIError)
+    @pytest.mark.asyncio
+    async def test_get_usage_retries_after_rate_limit(self):
+        """Test that a rate-limited usage lookup is retried when allowed."""
+        responses = [
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(200, json=USAGE_RESPONSE),
+        ]
+        client = make_client(lambda request: responses.pop(0))
 
+        assert await client.get_usage() == USAGE_RESPONSE
+        assert responses == []
 
-class TestErrorHandling:
-    """Test error handling in client."""
+    @pytest.mark.asyncio
+    async def test_analyze_sends_json_body(self):
+        """Test that the analysis request is posted as a JSON body."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json=ANALYSIS_RESPONSE)
+
+        client = make_client(handler)
+
+        result = await client.analyze(ANALYSIS_REQUEST)
+
+        assert result == ANALYSIS_RESPONSE
+        assert requests[0].headers["Content-Type"] == "application/json"
+        assert json.loads(requests[0].content) == ANALYSIS_REQUEST
+
+    def test_error_detail(self):
+        """Test that error details fall back when the body is unusable."""
+        assert _error_detail(b'{"detail": "Private repo"}') == "Private repo"
+        assert _error_detail(b"{}", "Fallback") == "Fallback"
+        assert _error_detail(b"<html>Bad Gateway</html>", "Fallback") == "Fallback"
+        assert _error_detail(b'["not", "an", "object"]') == ""
+        assert _error_detail(b"") == ""
+
+    def test_parse_retry_after(self):
+        """Test Retry-After parsing for seconds, dates and junk."""
+        assert parse_retry_after(httpx.Headers({"Retry-After": "7"})) == 7.0
+        past = httpx.Headers({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        assert parse_retry_after(past) == 0.0
+        assert parse_retry_after(httpx.Headers({"Retry-After": "soon"})) is None
+        assert parse_retry_after(httpx.Headers()) is None
 
-    def test_error_classes_exist(self):
-        """Test that error classes can be instantiated."""
-        # Just test that the error classes exist and work
-        payment_error = PaymentRequiredError("Payment required")
-        forbidden_error = ForbiddenError("Forbidden")
-        rate_limit_error = RateLimitError("Rate limited")
-
-        assert str(payment_error) == "Payment required"
-        assert str(forbidden_error) == "Forbidden"
-        assert str(rate_limit_error) == "Rate limited"
-
-        # Test inheritance
-        assert isinstance(payment_error, StrideAPIError)
-        assert isinstance(forbidden_error, StrideAPIError)
-        assert isinstance(rate_limit_error, StrideAPIError)
+    @pytest.mark.asyncio
+    async def test_analyze_retry_on_failure(self, no_retry_sleep):
+        """Test that transient failures are retried with backoff."""
+        responses = [
+            httpx.Response(503),
+            httpx.Response(503),
+            httpx.Response(200, json=ANALYSIS_RESPONSE),
+        ]
+        client = make_client(lambda request: responses.pop(0))
+
+        result = await client.analyze(ANALYSIS_REQUEST)
+
+        assert result == ANALYSIS_RESPONSE
+        assert no_retry_sleep.await_count == 2
+        assert all(call.args[0] >= 4 for call in no_retry_sleep.await_args_list)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "status, body, headers, error_class, message",
+        [
+            (
+                402,
+                b'{"detail": "Private repos need a plan"}',
+                {},
+                PaymentRequiredError,
+                "Private repositories",
+            ),
+            (402, b"", {}, PaymentRequiredError, "Monthly limit reached"),
+            (403, b"", {}, ForbiddenError, "Invalid API key"),
+            (429, b"", {"Retry-After": "0"}, RateLimitError, "Rate limit exceeded"),
+        ],
+        ids=["private-repo", "limit-reached", "forbidden", "rate-limited"],
+    )
+    async def test_analyze_http_errors(
+        self, status, body, headers, error_class, message
+    ):
+        """Test that analyze raises the specific error for each status."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(status, content=body, headers=headers)
+
+        client = make_client(handler)
+
+        with pytest.raises(error_class, match=message):
+            await client.analyze(ANALYSIS_REQUEST)
+        # Only rate limits are worth retrying
+        assert len(requests) == (3 if status == 429 else 1)
+
+    @pytest.mark.asyncio
+    async def test_limit_reached_reaches_analyzer(self, mock_github_client):
+        """Test that a 402 is not retried and becomes a limit-reached result."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(402)
+
+        analyzer = ActionAnalyzer(mock_github_client, make_client(handler))
+
+        result = await analyzer.analyze_pr(42)
+
+        assert result.is_limited is True
+        assert result.usage_info == {"limit_reached": True}
+        assert len(requests) == 1
+
+    @pytest.mark.parametrize(
+        "status, body, error_class, message",
+        [
+            (
+                402,
+                b'{"detail": "Private repos need a plan"}',
+                PaymentRequiredError,
+                "Private repositories",
+            ),
+            (402, b"", PaymentRequiredError, "Monthly limit reached"),
+            (403, b'{"detail": "Key revoked"}', ForbiddenError, "Key revoked"),
+            (429, b"", RateLimitError, "Rate limit exceeded"),
+        ],
+    )
+    def test_error_handlers_by_status(self, status, body, error_class, message):
+        """Test that each mapped status raises its specific error."""
+        with pytest.raises(error_class, match=message):
+            _ERROR_HANDLERS[status](httpx.Response(status, content=body), body)